@@ -1,4 +1,5 @@
 import warnings
+from itertools import chain
 
 
 class RoffFormatError(Exception):
@@ -29,27 +30,35 @@ class EndianessHandler:
         If given the filedata tag, check for byteswaptest tagkey
         and set endianess of parser and tokenizer accordingly.
         """
-        if tag[0] == "filedata":
-            if self.found_byteswaptest:
+        if self.found_byteswaptest:
+            # Endianess is settled, only duplicate filedata tags
+            # remain to be checked for.
+            if tag[0] == "filedata":
                 raise RoffFormatError("Roff file has duplicate filedata tags.")
-
-            tagkeys = dict(list(tag[1]))
-            if "byteswaptest" not in tagkeys:
+            return tag
+        if tag[0] == "filedata":
+            # Only the tagkeys up to byteswaptest are consumed here, so
+            # the remaining tagkeys are parsed with the correct endianess.
+            tagkeys = iter(tag[1])
+            consumed = []
+            for tagkey in tagkeys:
+                if tagkey[0] == "byteswaptest":
+                    byteswaptest = tagkey[1]
+                    break
+                consumed.append(tagkey)
+            else:
                 raise RoffFormatError(
                     "Roff file tag filedata is missing byteswapttest tagkey."
                 )
 
             self.found_byteswaptest = True
-            if tagkeys["byteswaptest"] != 1:
+            if byteswaptest != 1:
                 self.roff_parser.swap_endianess()
                 self.roff_tokenizer.swap_endianess()
-                tagkeys["byteswaptest"] = 1
-            return (tag[0], tagkeys.items())
-        if (
-            not self.found_byteswaptest
-            and not self.has_warned
-            and self.roff_parser.is_binary_file
-        ):
+                byteswaptest = 1
+            consumed.append(("byteswaptest", byteswaptest))
+            return (tag[0], chain(consumed, tagkeys))
+        if not self.has_warned and self.roff_parser.is_binary_file:
             self.has_warned = True
             warnings.warn(
                 "First tag of file is not filedata, "
@@ -60,11 +69,5 @@ class EndianessHandler:
         return tag
 
     def __iter__(self):
-        roff_iterator = iter(self.roff_parser)
-        while True:
-            try:
-                tag = next(roff_iterator)
-                new_tag = self.check_endianess(tag)
-                yield new_tag
-            except StopIteration:
-                return
+        for tag in self.roff_parser:
+            yield self.check_endianess(tag)
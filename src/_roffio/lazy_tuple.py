@@ -1,9 +1,9 @@
 class LazyTuple:
     """
-    A Tuple where the elements are not evaluated
+    A Tuple where the second element is not evaluated
     until fetched or the tuple deconstructed.
 
-    >>> lt = LazyTuple(lambda : 3, lambda: 4)
+    >>> lt = LazyTuple(3, lambda: 4)
     >>> a, b = lt
     >>> a
     3
@@ -12,48 +12,46 @@ class LazyTuple:
 
     """
 
-    def __init__(self, callback1, callback2):
+    __slots__ = ("_name", "_values_cb", "_values")
+
+    def __init__(self, name, values_cb):
         """
-        :param callback1: The function to evaluate
-            to get the first value
-        :param callback2: The function to evaluate
+        :param name: The first value.
+        :param values_cb: The function to evaluate
             to get the second value
         """
-        self.callback1 = callback1
-        self.callback2 = callback2
+        self._name = name
+        self._values_cb = values_cb
 
-        self._value1 = None
-        self._value2 = None
+        self._values = None
 
     @property
     def value1(self):
-        if self._value1 is None:
-            self._value1 = self.callback1()
-        return self._value1
+        return self._name
 
     @property
     def value2(self):
-        if self._value2 is None:
-            self._value2 = self.callback2()
-        return self._value2
+        if self._values is None:
+            self._values = self._values_cb()
+        return self._values
 
     def __len__(self):
         return 2
 
     def __getitem__(self, key):
         if key == 0:
-            return self.value1
+            return self._name
 
         if key == 1:
             return self.value2
         raise KeyError(f"Lazytuple accepts key=0,1 only, got: {key}")
 
     def __iter__(self):
-        yield self[0]
-        yield self[1]
+        yield self._name
+        yield self.value2
 
     def __str__(self):
-        return f"LazyTuple({self.callback1}, {self.callback2})"
+        return f"LazyTuple({self._name!r}, {self._values_cb})"
 
     def __repr__(self):
-        return f"LazyTuple({self.callback1}, {self.callback2})"
+        return f"LazyTuple({self._name!r}, {self._values_cb})"
@@ -5,11 +5,15 @@ dictionary of tagname and tagkeyname to values, but for subsections of roff
 files, the parser returns the corresponding subdata of the dictionary.
 """
 
-from itertools import chain, dropwhile, tee
+import io
+import struct
+import sys
 
 import numpy as np
 
 from _roffio.lazy_tuple import LazyTuple
+from _roffio.tokenizer.common import has_offset_positions
+from _roffio.tokenizer.token import Token
 from _roffio.tokenizer.token_kind import TokenKind
 
 
@@ -28,6 +32,47 @@ def as_ascii(bytelike):
     return bytelike
 
 
+def decode_ascii(bytelike):
+    """
+    Decode a byte like string as ascii.
+    """
+    return bytelike.decode("ascii")
+
+
+def ascii_decoder(stream):
+    """
+    Chooses the conversion from values read from the stream to
+    strings once, as a stream gives either only bytes or only strings.
+    :param stream: The stream the values are read from.
+    :returns: A function converting values read from the stream
+        to strings, see as_ascii.
+    """
+    if isinstance(stream, io.TextIOBase):
+        return str
+    if isinstance(stream, (io.BufferedIOBase, io.RawIOBase)):
+        return decode_ascii
+    return as_ascii
+
+
+def memoized_decoder(decode):
+    """
+    Memoize the given decoder. Used for names as the same
+    tag and tagkey names are repeated throughout a file.
+    :param decode: Conversion of values to strings, see ascii_decoder.
+    :returns: The memoized conversion.
+    """
+    cache = {}
+
+    def memoized(value):
+        try:
+            return cache[value]
+        except KeyError:
+            decoded = cache[value] = decode(value)
+            return decoded
+
+    return memoized
+
+
 class ParsingException(Exception):
     """
     Raised by the parser if the list of tokens is not of the expected section,
@@ -77,17 +122,24 @@ def parse_one_of(*kinds):
 
 parse_simple_type = parse_one_of(*TokenKind.simple_types())
 
+# Set of the simple types for fast membership
+# tests when dispatching on the type of a tagkey.
+simple_types = frozenset(TokenKind.simple_types())
+numeric_types = frozenset((TokenKind.INT, TokenKind.FLOAT, TokenKind.DOUBLE))
+
 
-def parse_name(tokens, stream):
+def parse_name(tokens, stream, decode=as_ascii):
     """
     Takes a token with token.kind == TokenKind.NAME from the stream
-    and yields the name as a string.
+    and returns the name as a string.
+    :param decode: Conversion of the token value to string,
+        see ascii_decoder.
     """
     token = next(tokens)
     if token.kind != TokenKind.NAME:
         raise RoffTypeError(f"Expected name at {token.start} found {token.kind}")
 
-    yield as_ascii(token.get_value(stream))
+    return decode(token.get_value(stream))
 
 
 # Map from endianess and token kind to numpy dtype
@@ -105,6 +157,54 @@ dtype = {
     "big": {tk: np.dtype(dt).newbyteorder(">") for tk, dt in dtype_little.items()},
 }
 
+# Map from the dtypes above to a precompiled struct and the numpy
+# scalar type, used for decoding single binary numeric values
+# without allocating an intermediate array.
+struct_format = {
+    TokenKind.BYTE: "B",
+    TokenKind.BOOL: "?",
+    TokenKind.INT: "i",
+    TokenKind.FLOAT: "f",
+    TokenKind.DOUBLE: "d",
+}
+scalar_struct = {
+    dtype[endianess][tk]: (
+        struct.Struct(prefix + fmt),
+        np.dtype(dtype[endianess][tk]).type,
+    )
+    for endianess, prefix in (("little", "<"), ("big", ">"))
+    for tk, fmt in struct_format.items()
+}
+
+
+def decode_array_blob(buf, typ, endianess, number, name):
+    """
+    Decode the contents of an array blob into a numpy array
+    in native byte order.
+    :param buf: The bytes of the array blob.
+    :param typ: The TokenKind of the elements in the array,
+        eg. TokenKind.INT.
+    :param endianess: The endianess of the values in buf,
+        either "little" or "big".
+    :param number: The number of elements in the array.
+    :param name: The name of the array tagkey.
+    :returns: A numpy array of the given number of elements. When
+        the endianess is native, this is a read-only view of buf,
+        otherwise it is a byteswapped copy.
+    """
+    element_dtype = dtype_little[typ]
+    if len(buf) < number * np.dtype(element_dtype).itemsize:
+        raise RoffSyntaxError(
+            f"Expected {number} values in array {name}, got {len(buf)} bytes"
+        )
+    values = np.frombuffer(buf, element_dtype, count=number)
+    if endianess != sys.byteorder and values.itemsize > 1:
+        # A single bulk swap of the whole array is much
+        # cheaper than keeping a non-native dtype around.
+        values = values.copy()
+        values.byteswap(inplace=True)
+    return values
+
 
 class RoffTagKeyParser:
     """
@@ -122,62 +222,109 @@ class RoffTagKeyParser:
 
     """
 
-    def __init__(self, tokens, stream, roffparser):
+    def __init__(self, tokens, stream, roffparser, tag_name=None):
         """
         :param tokens: iterator of tokens.
         :param stream: stream of characters the tokens
             refer to.
         :param roffparser: The roffparser used for
             shared parameters.
+        :param tag_name: The name of the tag the tagkeys
+            belong to, used in error messages.
         """
         self.tokens = tokens
         self.stream = stream
         self.roffparser = roffparser
+        self.tag_name = tag_name
+        self.as_ascii = ascii_decoder(stream)
+        self._peeked = None
+
+    def peek_token(self):
+        """
+        :returns: The next token without consuming it.
+        """
+        if self._peeked is None:
+            self._peeked = next(self.tokens)
+        return self._peeked
+
+    def next_token(self):
+        """
+        Consume the next token, including any token
+        looked at by peek_token.
+        """
+        token = self._peeked
+        if token is None:
+            return next(self.tokens)
+        self._peeked = None
+        return token
 
     def __iter__(self):
-        first_tok = next(self.tokens)
-        self.tokens = chain([first_tok], self.tokens)
-        while first_tok.kind != TokenKind.ENDTAG:
-            yield from self.parse_tagkey()
-            first_tok = next(self.tokens)
-            self.tokens = chain([first_tok], self.tokens)
+        try:
+            while self.peek_token().kind != TokenKind.ENDTAG:
+                yield self.parse_tagkey()
+        except StopIteration as err:
+            if self.tag_name is None:
+                raise RoffSyntaxError("Reached end of file before endtag") from err
+            raise RoffSyntaxError(
+                f"did not find closing endtag for tag {self.tag_name}"
+            ) from err
+
+    def skip_to_endtag(self):
+        """
+        Move the token iterator shared with the RoffParser past the
+        endtag. The tokens of any tagkeys not yet parsed are kept, so
+        that iterating over this parser still gives the remaining
+        tagkeys after the RoffParser has moved on to the next tag.
+        When all tagkeys have been parsed, only the endtag is left.
+        """
+        remaining = [] if self._peeked is None else [self._peeked]
+        while not remaining or remaining[-1].kind != TokenKind.ENDTAG:
+            remaining.append(next(self.tokens))
+        self._peeked = None
+        self.tokens = iter(remaining)
 
     def parse_boolean_value(self):
         """
         Takes a boolean value token from the token generator and
-        yields the boolean value.
+        returns the boolean value.
         :param dtype: The numpy dtype of the numeric value.
         """
-        num_token = next(self.tokens)
+        num_token = self.next_token()
         val_str = num_token.get_value(self.stream)
         if len(val_str) != 1:
             raise RoffSyntaxError(f"too long boolean value, found: {val_str}")
         if self.roffparser.is_binary_file:
-            value = int.from_bytes(val_str, self.roffparser.endianess)
+            # A single byte has no endianess.
+            value = val_str[0]
         else:
-            value = int(as_ascii(val_str))
+            value = int(self.as_ascii(val_str))
 
         if value == 1:
-            yield True
+            return True
         elif value == 0:
-            yield False
+            return False
         else:
             raise RoffTypeError(f"boolean values must be either 1 or 0, found {value}")
 
     def parse_numeric_value(self, dtype):
         """
         Takes a numeric token from the token generator and
-        yields the numeric value.
+        returns the numeric value.
         :param dtype: The numpy dtype of the numeric value.
         """
-        num_token = next(self.tokens)
+        num_token = self.next_token()
         if num_token.kind == TokenKind.NUMERIC_VALUE:
             try:
-                yield dtype(num_token.get_value(self.stream))
+                return dtype(num_token.get_value(self.stream))
             except ValueError as err:
                 raise RoffSyntaxError(f"Could not parse {dtype} got {err}") from err
         elif num_token.kind == TokenKind.BINARY_NUMERIC_VALUE:
-            yield np.ndarray((1,), dtype, num_token.get_value(self.stream))[0]
+            buf = num_token.get_value(self.stream)
+            try:
+                unpacker, scalar_type = scalar_struct[dtype]
+            except KeyError:
+                return np.frombuffer(buf, dtype, count=1)[0]
+            return scalar_type(unpacker.unpack(buf)[0])
         else:
             if num_token.kind == TokenKind.STRING_LITERAL:
                 raise RoffTypeError(
@@ -190,15 +337,15 @@ class RoffTagKeyParser:
     def parse_string_literal(self):
         """
         Takes a string literal token from the token generator and
-        yields the string.
+        returns the string.
         """
-        token = next(self.tokens)
+        token = self.next_token()
         if token.kind != TokenKind.STRING_LITERAL:
             raise RoffTypeError(
                 f"Expected string literal at {token.start} found {token.kind}"
             )
 
-        yield as_ascii(token.get_value(self.stream))
+        return self.as_ascii(token.get_value(self.stream))
 
     def parse_value(self, typ):
         """
@@ -207,14 +354,14 @@ class RoffTagKeyParser:
         :param typ: one of TokenKind.simple_types.
         """
         if typ == TokenKind.CHAR:
-            yield from self.parse_string_literal()
+            return self.parse_string_literal()
         elif typ == TokenKind.BOOL:
-            yield from self.parse_boolean_value()
+            return self.parse_boolean_value()
         elif typ == TokenKind.BYTE:
-            val = next(self.parse_numeric_value(dtype[self.roffparser.endianess][typ]))
-            yield val.tobytes()
+            val = self.parse_numeric_value(self.roffparser.dtype_map[typ])
+            return val.tobytes()
         else:
-            yield from self.parse_numeric_value(dtype[self.roffparser.endianess][typ])
+            return self.parse_numeric_value(self.roffparser.dtype_map[typ])
 
     def parse_simple_tagkey_body(self, typ):
         """
@@ -222,9 +369,15 @@ class RoffTagKeyParser:
         token after the simple type.
         :param typ: The kind of the simple type token
         """
-        name = next(parse_name(self.tokens, self.stream))
-        value = next(self.parse_value(typ))
-        yield (name, value)
+        name = parse_name(self.tokens, self.stream, self.roffparser.decode_name)
+        token = self.peek_token()
+        if token.kind == TokenKind.BINARY_NUMERIC_VALUE and typ in numeric_types:
+            # Fast path for the common case of a binary
+            # int, float or double, see parse_numeric_value.
+            self.next_token()
+            unpacker, scalar_type = scalar_struct[self.roffparser.dtype_map[typ]]
+            return (name, scalar_type(unpacker.unpack(token.get_value(self.stream))[0]))
+        return (name, self.parse_value(typ))
 
     def parse_array_values(self, typ, name, number):
         """
@@ -235,56 +388,198 @@ class RoffTagKeyParser:
         :param name: The name of the array tagkey.
         :param number: The number of elements in the array.
         """
-        first_tok = next(self.tokens)
+        first_tok = self.peek_token()
         if first_tok.kind == TokenKind.ARRAYBLOB:
+            self.next_token()
             if typ == TokenKind.BYTE:
-                yield (lambda: first_tok.get_value(self.stream))
-            else:
-                yield (
-                    lambda: np.ndarray(
-                        number,
-                        dtype[self.roffparser.endianess][typ],
-                        first_tok.get_value(self.stream),
-                    )
-                )
+                return lambda: first_tok.get_value(self.stream)
+            return lambda: decode_array_blob(
+                first_tok.get_value(self.stream),
+                typ,
+                self.roffparser.endianess,
+                number,
+                name,
+            )
+        elif first_tok.kind == TokenKind.BINARY_NUMERIC_VALUE and typ != TokenKind.CHAR:
+            return self.parse_binary_array_values(typ, name, number)
+        elif first_tok.kind == TokenKind.NUMERIC_VALUE and typ in (
+            TokenKind.BYTE,
+            TokenKind.INT,
+            TokenKind.FLOAT,
+            TokenKind.DOUBLE,
+        ):
+            return self.parse_ascii_array_values(typ, name, number)
         else:
-            self.tokens = chain([first_tok], self.tokens)
             try:
-                vals = np.array([next(self.parse_value(typ)) for _ in range(number)])
-                if typ == TokenKind.BYTE:
-                    yield vals.tobytes()
+                if typ == TokenKind.CHAR:
+                    vals = np.array(self.parse_string_array_values(number))
                 else:
-                    yield vals
+                    # The element dtype and count are known up front, so
+                    # the result buffer is allocated once. Bytes are parsed
+                    # as uint8 here and converted to bytes below.
+                    element_dtype = self.roffparser.dtype_map[typ]
+                    if typ == TokenKind.BYTE:
+                        values = (
+                            self.parse_numeric_value(element_dtype)
+                            for _ in range(number)
+                        )
+                    else:
+                        values = (self.parse_value(typ) for _ in range(number))
+                    vals = np.fromiter(values, dtype=element_dtype, count=number)
+                if typ == TokenKind.BYTE:
+                    return vals.tobytes()
+                return vals
             except StopIteration as stop_it:
                 raise RoffSyntaxError(
                     f"Expected {number} values to follow array {name} at {first_tok.start}"
                 ) from stop_it
 
+    def parse_string_array_values(self, number):
+        """
+        Parse the given number of string literal values. When positions
+        in the stream are offsets, the values are read from the stream
+        together and sliced out, rather than seeking and reading for
+        each value.
+        :param number: The number of values.
+        :returns: List of the strings.
+        """
+        if not (self.roffparser.is_binary_file or has_offset_positions(self.stream)):
+            return [self.parse_string_literal() for _ in range(number)]
+        tokens = []
+        for _ in range(number):
+            token = self.next_token()
+            if token.kind != TokenKind.STRING_LITERAL:
+                raise RoffTypeError(
+                    f"Expected string literal at {token.start} found {token.kind}"
+                )
+            tokens.append(token)
+        if not tokens:
+            return []
+        start = tokens[0].start
+        span = Token(TokenKind.STRING_LITERAL, start, tokens[-1].end)
+        values = self.as_ascii(span.get_value(self.stream))
+        return [values[t.start - start : t.end - start] for t in tokens]
+
+    def parse_binary_array_values(self, typ, name, number):
+        """
+        Parse array values given as one binary numeric value token
+        per element. The values are joined and decoded in one go
+        as if given as an array blob. The binary tokenizer gives array
+        blobs for numeric arrays, so this is for token streams with
+        one token per element, eg. from combining tokenizers.
+        :param typ: the TokenKind describing the type of
+            elements in the array, eg. TokenKind.INT.
+        :param name: The name of the array tagkey.
+        :param number: The number of elements in the array.
+        """
+        buffers = []
+        for _ in range(number):
+            try:
+                token = self.next_token()
+            except StopIteration as stop_it:
+                raise RoffSyntaxError(
+                    f"Expected {number} values to follow array {name}"
+                ) from stop_it
+            if token.kind != TokenKind.BINARY_NUMERIC_VALUE:
+                raise RoffTypeError(
+                    f"Expected binary numeric value at {token.start} found {token.kind}"
+                )
+            buffers.append(token.get_value(self.stream))
+        buf = b"".join(buffers)
+        if typ == TokenKind.BYTE:
+            return buf
+        if typ == TokenKind.BOOL:
+            values = np.frombuffer(buf, np.uint8)
+            invalid = values[values > 1]
+            if invalid.size:
+                raise RoffTypeError(
+                    f"boolean values must be either 1 or 0, found {invalid[0]}"
+                )
+            return values.astype(np.bool_)
+        return decode_array_blob(buf, typ, self.roffparser.endianess, number, name)
+
+    def parse_ascii_array_values(self, typ, name, number):
+        """
+        Parse numeric array values given as one ascii numeric value
+        token per element. The value strings are read and
+        converted by numpy in one go.
+        :param typ: the TokenKind describing the type of
+            elements in the array, eg. TokenKind.INT.
+        :param name: The name of the array tagkey.
+        :param number: The number of elements in the array.
+        """
+        tokens = []
+        for _ in range(number):
+            try:
+                token = self.next_token()
+            except StopIteration as stop_it:
+                raise RoffSyntaxError(
+                    f"Expected {number} values to follow array {name}"
+                ) from stop_it
+            if token.kind == TokenKind.STRING_LITERAL:
+                raise RoffTypeError(
+                    f"Expected numeric value at {token.start} found string literal"
+                )
+            if token.kind != TokenKind.NUMERIC_VALUE:
+                raise ParsingException(
+                    f"Expected numeric value, got {token.kind} at {token.start}"
+                )
+            tokens.append(token)
+        strings = self.read_value_strings(tokens)
+        element_dtype = self.roffparser.dtype_map[typ]
+        try:
+            vals = np.array(strings, dtype=str).astype(element_dtype)
+        except ValueError as err:
+            raise RoffSyntaxError(f"Could not parse {element_dtype} got {err}") from err
+        if typ == TokenKind.BYTE:
+            return vals.tobytes()
+        return vals
+
+    def read_value_strings(self, tokens):
+        """
+        Read the strings of the given consecutive value tokens. When
+        the values are only separated by whitespace, the whole range is
+        read from the stream at once and split, instead of reading each
+        token separately.
+        :param tokens: List of value tokens in the order of the stream.
+        :returns: List of the value of each token as a string.
+        """
+        if not tokens:
+            return []
+        go_back = self.stream.tell()
+        self.stream.seek(tokens[0].start)
+        span = self.as_ascii(self.stream.read(tokens[-1].end - tokens[0].start))
+        self.stream.seek(go_back)
+        # Comments may also separate values, and in text mode
+        # stream positions are not necessarily character counts,
+        # in either case we fall back to reading each token.
+        strings = span.split()
+        if "#" in span or len(strings) != len(tokens):
+            return [self.as_ascii(token.get_value(self.stream)) for token in tokens]
+        return strings
+
     def parse_array_tagkey_body(self):
         """
         Parses the contents of an array tag key following the Array token.
         """
         typ = next(parse_simple_type(self.tokens))
-        name = next(parse_name(self.tokens, self.stream))
-        number = next(
-            self.parse_numeric_value(dtype[self.roffparser.endianess][TokenKind.INT])
-        )
-        values = next(self.parse_array_values(typ, name, number))
+        name = parse_name(self.tokens, self.stream, self.roffparser.decode_name)
+        number = self.parse_numeric_value(self.roffparser.dtype_map[TokenKind.INT])
+        values = self.parse_array_values(typ, name, number)
         if isinstance(values, (np.ndarray, bytes)):
-            yield (name, values)
-        else:
-            yield LazyTuple(lambda: name, values)
+            return (name, values)
+        return LazyTuple(name, values)
 
     def parse_tagkey(self):
         """
-        Parse a tagkey, yields tuple of tagkey name and tagkey
+        Parse a tagkey, returns tuple of tagkey name and tagkey
         value.
         """
-        first_tok = next(self.tokens)
+        first_tok = self.next_token()
         if first_tok.kind == TokenKind.ARRAY:
-            yield from self.parse_array_tagkey_body()
-        elif first_tok.kind in TokenKind.simple_types():
-            yield from self.parse_simple_tagkey_body(first_tok.kind)
+            return self.parse_array_tagkey_body()
+        elif first_tok.kind in simple_types:
+            return self.parse_simple_tagkey_body(first_tok.kind)
         else:
             raise RoffSyntaxError(
                 f"expected tag key type at {first_tok.start} got {first_tok.kind}: {first_tok.get_value(self.stream)}"
@@ -321,6 +616,8 @@ class RoffParser:
         """
         self.tokens = tokens
         self.stream = stream
+        self.as_ascii = ascii_decoder(stream)
+        self.decode_name = memoized_decoder(self.as_ascii)
         self.is_binary_file = False
 
         self._endianess = None
@@ -335,6 +632,9 @@ class RoffParser:
         if value not in ["little", "big"]:
             raise ValueError("endianess has to be either 'little' or 'big'")
         self._endianess = value
+        # The token kind to dtype map for the current endianess,
+        # resolved here so the tagkey parsers only do one lookup.
+        self.dtype_map = dtype[value]
 
     def swap_endianess(self):
         if self.endianess == "little":
@@ -343,17 +643,19 @@ class RoffParser:
             self.endianess = "little"
 
     def parse_tag(self):
+        """
+        Parse the start of a tag, yields the tag name and the
+        RoffTagKeyParser for its tagkeys. The tagkey parser shares
+        the token iterator with the RoffParser until the RoffParser
+        moves on to the next tag, see RoffTagKeyParser.skip_to_endtag.
+        """
         try:
             next(parse_one_of(TokenKind.TAG)(self.tokens))
         except StopIteration:
             return
-        name = next(parse_name(self.tokens, self.stream))
-
-        self.tokens, tag_tokens = tee(self.tokens)
+        name = parse_name(self.tokens, self.stream, self.decode_name)
 
-        tagkey_generator = iter(RoffTagKeyParser(tag_tokens, self.stream, self))
-        self.tokens = dropwhile(lambda t: t.kind != TokenKind.ENDTAG, self.tokens)
-        yield (name, tagkey_generator)
+        yield (name, RoffTagKeyParser(self.tokens, self.stream, self, name))
 
     def __iter__(self):
         header = next(parse_one_of(TokenKind.ROFF_BIN, TokenKind.ROFF_ASC)(self.tokens))
@@ -361,16 +663,16 @@ class RoffParser:
             self.is_binary_file = True
         while True:
             try:
-                tag = next(self.parse_tag())
-                try:
-                    next(parse_one_of(TokenKind.ENDTAG)(self.tokens))
-                except StopIteration as err:
-                    raise RoffSyntaxError(
-                        f"did not find closing endtag for tag {tag[0]}"
-                    ) from err
-                yield tag
+                name, tagkey_parser = next(self.parse_tag())
             except StopIteration:
                 break
+            yield (name, iter(tagkey_parser))
+            try:
+                tagkey_parser.skip_to_endtag()
+            except StopIteration as err:
+                raise RoffSyntaxError(
+                    f"did not find closing endtag for tag {name}"
+                ) from err
         try:
             t = next(self.tokens)
             raise RoffSyntaxError(f"Parsing ended with trailing tokens at {t.start}")
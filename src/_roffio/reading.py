@@ -1,5 +1,4 @@
 import pathlib
-from collections import defaultdict
 from contextlib import contextmanager
 
 import _roffio.parser as roffparse
@@ -18,29 +17,48 @@ def read(filelike):
     any level the value can be a list signifying that there was
     more than one tag/key with that value.
 
+    filelike is either a path or a stream of the file contents, for
+    instance an open file, io.BytesIO, or a read only mmap.mmap of
+    a binary roff file, which avoids reading through file buffers.
     """
-    result = defaultdict(list)
+    result = {}
+    duplicate_tags = set()
     with lazy_read(filelike) as roff_iter:
         for tag_name, tag_group in roff_iter:
-            result_tagkey = defaultdict(list)
+            result_tagkey = {}
+            duplicate_keys = set()
             for tagkey_name, value in tag_group:
-                result_tagkey[tagkey_name].append(value)
-            result[tag_name].append(result_tagkey)
+                add_value(result_tagkey, duplicate_keys, tagkey_name, value)
+            add_value(result, duplicate_tags, tag_name, result_tagkey)
 
-    for tag_name, tag_groups in list(result.items()):
-        for i, tag_group in enumerate(list(tag_groups)):
-            for key_name, values in list(tag_group.items()):
-                if len(values) == 1:
-                    tag_group[key_name] = values[0]
-            result[tag_name][i] = dict(tag_group)
-        if len(tag_groups) == 1:
-            result[tag_name] = tag_groups[0]
+    return result
 
-    return dict(result)
+
+def add_value(values, duplicates, key, value):
+    """
+    Sets values[key] to value, or if key is already in values,
+    to the list of all values given for key.
+    :param values: dictionary to add the value to.
+    :param duplicates: set of keys in values that have been given
+        more than once, updated by add_value.
+    """
+    if key not in values:
+        values[key] = value
+    elif key in duplicates:
+        values[key].append(value)
+    else:
+        values[key] = [values[key], value]
+        duplicates.add(key)
+
+
+# Buffer size used when opening binary files. The tokenizer
+# does many small reads and seeks, so a large buffer means
+# fewer system calls for typical roff files with big arrays.
+BINARY_BUFFER_SIZE = 1 << 20
 
 
 def make_filestream(filelike):
-    file_stream = open(filelike, "rb")  # noqa SIM115
+    file_stream = open(filelike, "rb", buffering=BINARY_BUFFER_SIZE)  # noqa SIM115
     tokenizer = rofftok.RoffTokenizer(file_stream)
     try:
         next(iter(tokenizer))
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod, abstractproperty
+from functools import cached_property
 
-from _roffio.tokenizer.combinators import one_of, repeated
+from _roffio.tokenizer.combinators import repeated
 from _roffio.tokenizer.errors import TokenizationError
 from _roffio.tokenizer.token_kind import TokenKind
 
@@ -25,6 +26,30 @@ class AbstractRoffBodyTokenizer(ABC):
     def tokenize_keyword(self):
         pass
 
+    def tokenize_keyword_of(self, kinds):
+        """
+        :param kinds: List of keyword token kinds.
+        :returns: Tokenizer for any one of the keywords of the
+            given kinds, ie. the same as
+            one_of(*[self.tokenize_keyword[kind] for kind in kinds]).
+        """
+        match_keyword = self.match_keyword_of(kinds)
+
+        def keyword_tokenizer():
+            yield match_keyword()
+
+        return keyword_tokenizer
+
+    @abstractmethod
+    def match_keyword_of(self, kinds):
+        """
+        :param kinds: List of keyword token kinds.
+        :returns: Function taking any one of the keywords of the
+            given kinds from the stream and returning its token,
+            see tokenize_keyword_of.
+        """
+        pass
+
     def __iter__(self):
         return self.tokenize_roff_file()
 
@@ -52,10 +77,29 @@ class AbstractRoffBodyTokenizer(ABC):
         ]
         for stream containing "tag bool a 1 endtag".
         """
-        yield from self.tokenize_keyword[TokenKind.TAG]()
-        yield from self.tokenize_name()
-        yield from repeated(self.tokenize_tagkey)()
-        yield from self.tokenize_keyword[TokenKind.ENDTAG]()
+        yield self.match_tag()
+        yield self.match_name()
+        # The tagkeys are the bulk of the tokens, so rather than
+        # repeated(self.tokenize_tagkey), each is tokenized into a
+        # list by plain function calls, see tagkey_tokens. The
+        # endtag is matched together with the tagkey types so that
+        # the end of the group is found without a failed match.
+        match_tagkey_type_or_endtag = self.match_tagkey_type_or_endtag
+        tagkey_body_tokens = self.tagkey_body_tokens
+        tokens = []
+        try:
+            first_token = match_tagkey_type_or_endtag()
+            while first_token.kind != TokenKind.ENDTAG:
+                tokens.append(first_token)
+                tagkey_body_tokens(first_token.kind, tokens)
+                yield from tokens
+                tokens.clear()
+                first_token = match_tagkey_type_or_endtag()
+        except TokenizationError:
+            yield from tokens
+            yield from self.tokenize_keyword[TokenKind.ENDTAG]()
+            return
+        yield first_token
 
     def tokenize_array_tagkey(self):
         """
@@ -69,22 +113,44 @@ class AbstractRoffBodyTokenizer(ABC):
         for stream containing "int a 1 0".
         """
         yield from self.tokenize_keyword[TokenKind.ARRAY]()
+        yield from self.tokenize_array_tagkey_body()
+
+    def tokenize_array_tagkey_body(self):
+        """
+        Tokenize the remainder of an array tagkey following
+        the array keyword, see tokenize_array_tagkey.
+        """
+        tokens = []
         try:
-            element_type = next(self.tokenize_simple_type())
-        except StopIteration:
-            return
-        yield element_type
-        yield from self.tokenize_name()
-        try:
-            num_values = next(self.tokenize_array_size())
-        except StopIteration:
-            return
-        yield num_values
+            self.array_tagkey_body_tokens(tokens)
+        except TokenizationError:
+            yield from tokens
+            raise
+        yield from tokens
+
+    def array_tagkey_body_tokens(self, tokens):
+        """
+        Append the tokens of the remainder of an array tagkey following
+        the array keyword to the given list, see tokenize_array_tagkey_body
+        and tagkey_tokens.
+        :param tokens: The list the tokens are appended to.
+        """
+        element_type = self.match_simple_type()
+        tokens.append(element_type)
+        tokens.append(self.match_name())
+        num_values = self.match_array_size()
+        tokens.append(num_values)
+        tokens.extend(self.tokenize_array_data(element_type.kind, num_values))
 
-        yield from self.tokenize_array_data(element_type.kind, num_values)
+    def tokenize_array_size(self):
+        yield self.match_array_size()
 
     @abstractmethod
-    def tokenize_array_size(self):
+    def match_array_size(self):
+        """
+        Take the number of values of an array from the stream
+        and return its token, see tokenize_array_size.
+        """
         pass
 
     @abstractmethod
@@ -96,23 +162,87 @@ class AbstractRoffBodyTokenizer(ABC):
         """
         pass
 
-    @property
+    @cached_property
     def tokenize_simple_type(self):
-        return one_of(*[self.tokenize_keyword[st] for st in TokenKind.simple_types()])
+        return self.tokenize_keyword_of(TokenKind.simple_types())
+
+    @cached_property
+    def match_simple_type(self):
+        """
+        Take a simple type keyword, see tokenize_simple_type.
+        """
+        return self.match_keyword_of(TokenKind.simple_types())
+
+    @cached_property
+    def match_tag(self):
+        """
+        Take the tag keyword.
+        """
+        return self.match_keyword_of((TokenKind.TAG,))
+
+    @cached_property
+    def tokenize_tagkey_type(self):
+        """
+        Tokenize the keyword starting a tagkey, that is
+        either the array keyword or a simple type.
+        """
+        return self.tokenize_keyword_of((TokenKind.ARRAY, *TokenKind.simple_types()))
+
+    @cached_property
+    def match_tagkey_type(self):
+        """
+        Take the keyword starting a tagkey, see tokenize_tagkey_type.
+        """
+        return self.match_keyword_of((TokenKind.ARRAY, *TokenKind.simple_types()))
+
+    @cached_property
+    def match_tagkey_type_or_endtag(self):
+        """
+        Take either the keyword starting a tagkey
+        or the endtag keyword, see match_tagkey_type.
+        """
+        return self.match_keyword_of(
+            (TokenKind.ARRAY, *TokenKind.simple_types(), TokenKind.ENDTAG)
+        )
 
-    @property
     def tokenize_tagkey(self):
         """
         Tokenize stream containing either a simple or array tagkey see
         RoffTokenizer.tokenize_simple_tagkey and
         RoffTokenizer.tokenize_array_tagkey.
         """
-        return one_of(
-            self.tokenize_simple_tagkey,
-            self.tokenize_array_tagkey,
-        )
+        first_token = next(self.tokenize_tagkey_type())
+        yield first_token
+        if first_token.kind == TokenKind.ARRAY:
+            yield from self.tokenize_array_tagkey_body()
+        else:
+            yield from self.tokenize_simple_tagkey_body(first_token.kind)
+
+    def tagkey_tokens(self, tokens):
+        """
+        Append the tokens of a tagkey to the given list, the same as
+        tokens.extend(self.tokenize_tagkey()). If tokenization fails,
+        the tokens up to the failure have been appended when
+        TokenizationError is raised.
+        :param tokens: The list the tokens are appended to.
+        """
+        first_token = self.match_tagkey_type()
+        tokens.append(first_token)
+        self.tagkey_body_tokens(first_token.kind, tokens)
+
+    def tagkey_body_tokens(self, typ, tokens):
+        """
+        Append the tokens of the remainder of a tagkey following
+        its first keyword to the given list, see tagkey_tokens.
+        :param typ: TokenKind of the first keyword, either
+            TokenKind.ARRAY or a simple type.
+        :param tokens: The list the tokens are appended to.
+        """
+        if typ == TokenKind.ARRAY:
+            self.array_tagkey_body_tokens(tokens)
+        else:
+            self.simple_tagkey_tokens(typ, tokens)
 
-    @abstractmethod
     def tokenize_simple_tagkey(self):
         """
         Tokenize a non-array binary tag key, yields
@@ -123,10 +253,44 @@ class AbstractRoffBodyTokenizer(ABC):
         ]
         for stream containing "bool a 1".
         """
-        pass
+        type_token = next(self.tokenize_simple_type())
+        yield type_token
+        yield from self.tokenize_simple_tagkey_body(type_token.kind)
+
+    def tokenize_simple_tagkey_body(self, typ):
+        """
+        Tokenize the remainder of a simple tagkey following
+        the type keyword, see tokenize_simple_tagkey.
+        :param typ: TokenKind of the simple type.
+        """
+        tokens = []
+        try:
+            self.simple_tagkey_tokens(typ, tokens)
+        except TokenizationError:
+            yield from tokens
+            raise
+        yield from tokens
 
     @abstractmethod
+    def simple_tagkey_tokens(self, typ, tokens):
+        """
+        Append the tokens of the remainder of a simple tagkey
+        following the type keyword to the given list, see
+        tokenize_simple_tagkey_body and tagkey_tokens.
+        :param typ: TokenKind of the simple type.
+        :param tokens: The list the tokens are appended to.
+        """
+        pass
+
     def tokenize_name(self):
+        yield self.match_name()
+
+    @abstractmethod
+    def match_name(self):
+        """
+        Take a name from the stream and return its token,
+        see tokenize_name.
+        """
         pass
 
     @abstractmethod
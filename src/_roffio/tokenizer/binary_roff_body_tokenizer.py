@@ -1,12 +1,28 @@
-from functools import cached_property
+import io
+import re
+import struct
+from functools import cached_property, lru_cache
 
 from _roffio.tokenizer.abstract_roff_body_tokenizer import AbstractRoffBodyTokenizer
-from _roffio.tokenizer.combinators import bind, repeated
-from _roffio.tokenizer.common import tokenize_word
+from _roffio.tokenizer.common import (
+    ARRAY_CHUNK_SIZE,
+    SCAN_CHUNK_SIZE,
+    scan,
+    skip,
+)
 from _roffio.tokenizer.errors import TokenizationError
 from _roffio.tokenizer.token import Token
 from _roffio.tokenizer.token_kind import TokenKind
 
+# The number of bytes used to store each fixed bytesize type.
+token_lengths = {
+    TokenKind.BOOL: 1,
+    TokenKind.BYTE: 1,
+    TokenKind.INT: 4,
+    TokenKind.FLOAT: 4,
+    TokenKind.DOUBLE: 8,
+}
+
 
 def tokenlen(tokenkind):
     """
@@ -16,14 +32,55 @@ def tokenlen(tokenkind):
     :param tokenkind: A fixed bytesize type, eg. TokenKind.BOOL.
     :returns: The number of bytes used for that type.
     """
-    if tokenkind in (TokenKind.BOOL, TokenKind.BYTE):
-        return 1
-    elif tokenkind in (TokenKind.INT, TokenKind.FLOAT):
-        return 4
-    elif tokenkind == TokenKind.DOUBLE:
-        return 8
-    else:
-        raise TokenizationError(f"Attempted to read non-fixed size type {tokenkind}")
+    try:
+        return token_lengths[tokenkind]
+    except KeyError as err:
+        raise TokenizationError(
+            f"Attempted to read non-fixed size type {tokenkind}"
+        ) from err
+
+
+# Patterns for the comments in binary roff files, see
+# _roffio.tokenizer.common.scan. These also match when the terminating
+# character is missing so that we can report the error.
+comment_pattern = re.compile(rb"#[^#]*#?")
+# Comments are each followed by a delimiter, except that the last
+# comment may also be directly followed by the next token.
+comments_pattern = re.compile(rb"(?:#[^#]*#\0)*(?:#[^#]*#|(?P<incomplete>#[^#]*))?")
+# Prefix for matching any comments before a token atomically, ie.
+# without trying the token at parts of the comments (written with
+# a lookahead and backreference as atomic groups require python 3.11).
+comments_prefix = rb"(?=(?P<comments>(?:#[^#]*#\0)*(?:#[^#]*#)?))(?P=comments)"
+
+
+@lru_cache(maxsize=None)
+def keyword_matching(kinds):
+    """
+    The keyword tables are the same for every tokenizer,
+    so they are built once for each set of keywords matched.
+
+    :param kinds: Tuple of keyword token kinds.
+    :returns: Tuple of a pattern matching any comments followed by
+        one of the keywords and a delimiter, the dictionary from keyword
+        to its kind, and the start of the message for a failed match.
+    """
+    keywords = {TokenKind.keywords()[kind].encode("ascii"): kind for kind in kinds}
+    pattern = re.compile(
+        comments_prefix + b"(?P<keyword>" + b"|".join(map(re.escape, keywords)) + b")\0"
+    )
+    # Failing to match is expected when trying alternatives,
+    # such as another tagkey or the endtag, so the message is
+    # formatted up front rather than for every failure.
+    expected = f"Expected one of {list(keywords)} at "
+    return pattern, keywords, expected
+
+
+# Unpacks the number of values in a binary array
+# with the given endianess, see read_array_size.
+array_size_unpacker = {
+    "little": struct.Struct("<I").unpack,
+    "big": struct.Struct(">I").unpack,
+}
 
 
 class BinaryRoffBodyTokenizer(AbstractRoffBodyTokenizer):
@@ -44,36 +101,50 @@ class BinaryRoffBodyTokenizer(AbstractRoffBodyTokenizer):
     @cached_property
     def tokenize_keyword(self):
         return {
-            kw_kind: bind(
-                repeated(self.tokenize_comment),
-                self.binary_ended(
-                    tokenize_word(self.stream, kw.encode("ascii"), kw_kind)
-                ),
-            )
-            for kw_kind, kw in TokenKind.keywords().items()
+            kind: self.tokenize_keyword_of((kind,)) for kind in TokenKind.keywords()
         }
 
-    def binary_ended(self, tokenizer):
-        def binary_ended_tokenizer():
-            tok = next(tokenizer())
-            start = self.stream.tell()
-            read_char = self.stream.read(1)
-            if read_char != b"\0":
-                self.stream.seek(start)
-                raise TokenizationError(f"Expected delimiter at {start}")
-            yield tok
+    def match_keyword_of(self, kinds):
+        pattern, keywords, expected = keyword_matching(tuple(kinds))
+        stream = self.stream
+
+        def match_keyword():
+            start = stream.tell()
+            match = scan(stream, pattern, offset_positions=True, start=start)
+            if match is None:
+                # The comments may have been longer than the chunk
+                # scanned, so try again after the comments.
+                self.tokenize_comments()
+                start = stream.tell()
+                match = scan(stream, pattern, offset_positions=True, start=start)
+            if match is None:
+                raise TokenizationError(expected + str(start))
+            keyword_start = start + match.start("keyword")
+            return Token(
+                keywords[match.group("keyword")],
+                keyword_start,
+                keyword_start + len(match.group("keyword")),
+            )
 
-        return binary_ended_tokenizer
+        return match_keyword
 
-    @property
-    def tokenize_array_size(self):
-        return self.tokenize_numeric_value(TokenKind.INT)
+    def match_array_size(self):
+        start, end = self.skip_bytes(token_lengths[TokenKind.INT])
+        return Token(TokenKind.BINARY_NUMERIC_VALUE, start, end)
 
-    @property
-    def tokenize_name(self):
-        return bind(
-            repeated(self.tokenize_comment), self.tokenize_string(TokenKind.NAME)
-        )
+    def match_name(self):
+        # Names are seldom preceded by comments, so the comments
+        # are only skipped when the name does not start the chunk.
+        stream = self.stream
+        start = stream.tell()
+        buffer = stream.read(SCAN_CHUNK_SIZE)
+        end = buffer.find(b"\0")
+        if end != -1 and not buffer.startswith(b"#"):
+            stream.seek(start + end + 1)
+            return Token(TokenKind.NAME, start, start + end)
+        stream.seek(start)
+        self.tokenize_comments()
+        return self.match_string(TokenKind.NAME)
 
     def tokenize_numeric_value(self, tokenkind):
         """
@@ -83,12 +154,41 @@ class BinaryRoffBodyTokenizer(AbstractRoffBodyTokenizer):
         """
 
         def tok():
-            start = self.stream.tell()
-            self.stream.seek(start + tokenlen(tokenkind))
-            yield Token(TokenKind.BINARY_NUMERIC_VALUE, start, self.stream.tell())
+            start, end = self.skip_bytes(tokenlen(tokenkind))
+            yield Token(TokenKind.BINARY_NUMERIC_VALUE, start, end)
 
         return tok
 
+    def skip_bytes(self, length):
+        """
+        Skip the given number of bytes ahead in the stream. If the
+        stream ends before that, TokenizationError is raised with the
+        stream positioned at its end, as there is nothing further
+        to tokenize.
+
+        Note: Whether the stream ends early is checked by reading
+        the last byte, as seeking past the end of the stream is allowed
+        for files but raises ValueError for mmap.mmap.
+
+        :param length: The number of bytes to skip.
+        :returns: Tuple of the start and end position of the skipped bytes.
+        """
+        stream = self.stream
+        start = stream.tell()
+        end = start + length
+        if length:
+            try:
+                stream.seek(end - 1)
+                last = stream.read(1)
+            except ValueError:
+                last = b""
+            if not last:
+                stream.seek(0, io.SEEK_END)
+                raise TokenizationError(
+                    f"Reached end of stream while reading {length} bytes at {start}"
+                )
+        return start, end
+
     def tokenize_string(self, kind):
         """
         Combinator for tokenizing any binary string (any characters terminated by
@@ -97,17 +197,69 @@ class BinaryRoffBodyTokenizer(AbstractRoffBodyTokenizer):
         """
 
         def tokenizer():
-            start = self.stream.tell()
-            last_alnum = start
-            read_char = self.stream.read(1)
-            while read_char and read_char != b"\x00":
-                last_alnum = self.stream.tell()
-                read_char = self.stream.read(1)
-            if read_char != b"\0":
-                self.stream.seek(start)
+            yield self.match_string(kind)
+
+        return tokenizer
+
+    def match_string(self, kind):
+        """
+        Take a binary string from the stream, see tokenize_string.
+        :param kind: The TokenKind of the returned token.
+        """
+        stream = self.stream
+        start = stream.tell()
+        buffer = stream.read(SCAN_CHUNK_SIZE)
+        end = buffer.find(b"\0")
+        while end == -1:
+            more = stream.read(max(SCAN_CHUNK_SIZE, len(buffer)))
+            if not more:
+                stream.seek(start)
                 raise TokenizationError(f"could not tokenize string at {start}")
-            else:
-                yield Token(kind, start, last_alnum)
+            end = more.find(b"\0")
+            if end != -1:
+                end += len(buffer)
+            buffer += more
+        stream.seek(start + end + 1)
+        return Token(kind, start, start + end)
+
+    def tokenize_strings(self, kind, number):
+        """
+        Combinator for tokenizing the given number of consecutive binary
+        strings, the same as repeating tokenize_string(kind) number of times
+        but reading the stream in chunks rather than per string.
+        :param kind: The TokenKind yielded by the resulting tokenizer.
+        :param number: The number of strings.
+        """
+
+        def tokenizer():
+            # The strings are found by splitting chunks read from the
+            # stream at the terminators. pos is the position of the next
+            # string and rest is the unterminated remainder of what has
+            # been read, starting at pos.
+            stream = self.stream
+            pos = stream.tell()
+            rest = b""
+            remaining = number
+            tokens = []
+            append = tokens.append
+            # Read enough for a few bytes per string at a time, but
+            # at least as much as is already buffered when a string
+            # does not fit.
+            chunk_size = min(max(SCAN_CHUNK_SIZE, 16 * number), ARRAY_CHUNK_SIZE)
+            while remaining:
+                more = stream.read(max(chunk_size, len(rest)))
+                if not more:
+                    stream.seek(pos)
+                    raise TokenizationError(f"could not tokenize string at {pos}")
+                strings = (rest + more).split(b"\0", remaining)
+                rest = strings.pop()
+                remaining -= len(strings)
+                for string in strings:
+                    end = pos + len(string)
+                    append(Token(kind, pos, end))
+                    pos = end + 1
+            stream.seek(pos)
+            yield from tokens
 
         return tokenizer
 
@@ -133,6 +285,7 @@ class BinaryRoffBodyTokenizer(AbstractRoffBodyTokenizer):
         if value not in ["little", "big"]:
             raise ValueError("endianess has to be either 'little' or 'big'")
         self._endianess = value
+        self.unpack_array_size = array_size_unpacker[value]
 
     def swap_endianess(self):
         if self.endianess == "little":
@@ -149,18 +302,22 @@ class BinaryRoffBodyTokenizer(AbstractRoffBodyTokenizer):
 
         """
         start = self.stream.tell()
-        read_char = self.stream.read(1)
-        if read_char == b"#":
-            read_char = self.stream.read(1)
-            while read_char and read_char != b"#":
-                read_char = self.stream.read(1)
-            if not read_char:
-                self.stream.seek(start)
-                raise TokenizationError("Reached end of stream while reading comment")
-            yield from self.tokenize_delimiter()
-        else:
-            self.stream.seek(start)
+        match = scan(self.stream, comment_pattern, offset_positions=True, start=start)
+        if match is None:
             raise TokenizationError(f"Expected comment at {start}")
+        if match.end() < 2 or not match.group().endswith(b"#"):
+            self.stream.seek(start)
+            raise TokenizationError("Reached end of stream while reading comment")
+        yield from self.tokenize_delimiter()
+
+    def tokenize_comments(self):
+        """
+        Tokenize any number of comments, the same as
+        repeated(self.tokenize_comment) but without raising
+        TokenizationError at the end.
+        """
+        skip(self.stream, comments_pattern, offset_positions=True)
+        return iter([])
 
     def tokenize_array_data(self, element_type, num_values_token):
         """
@@ -172,33 +329,71 @@ class BinaryRoffBodyTokenizer(AbstractRoffBodyTokenizer):
         :param num_values_token: The token for the number of values
             in the array.
         """
-        num_values = int.from_bytes(
-            num_values_token.get_value(self.stream), self.endianess
-        )
+        num_values = self.read_array_size(num_values_token)
         # We do not use binary_delimited here because in the binary format it is
         # not possible to know whether you have a comment or a value starting with
         # b'#' Therefore we assume that no comments occur when we expect a value.
         if element_type == TokenKind.CHAR:
-            for _ in range(num_values):
-                yield from self.tokenize_string(TokenKind.STRING_LITERAL)()
+            yield from self.tokenize_strings(TokenKind.STRING_LITERAL, num_values)()
         else:
-            start = self.stream.tell()
-            self.stream.seek(start + tokenlen(element_type) * num_values)
-            yield Token(TokenKind.ARRAYBLOB, start, self.stream.tell())
+            start, end = self.skip_bytes(tokenlen(element_type) * num_values)
+            yield Token(TokenKind.ARRAYBLOB, start, end)
 
-    def tokenize_simple_tagkey(self):
+    def read_array_size(self, num_values_token):
         """
-        see AbstractRoffTokenizer.tokenize_simple_tagkey
+        Read the number of values in an array from the token of the array
+        size. Expects the stream to be positioned at the end of the token,
+        as it is when tokenizing the array data, and leaves it there.
+        :param num_values_token: The token for the number of values
+            in the array.
+        :returns: The number of values as an int.
         """
-        type_token = next(self.tokenize_simple_type())
+        self.stream.seek(num_values_token.start)
+        size_bytes = self.stream.read(num_values_token.end - num_values_token.start)
+        try:
+            return self.unpack_array_size(size_bytes)[0]
+        except struct.error as err:
+            raise TokenizationError(
+                f"Expected array size at {num_values_token.start}"
+            ) from err
 
-        yield type_token
-        yield from repeated(self.tokenize_comment)()
-        yield from self.tokenize_string(TokenKind.NAME)()
+    def simple_tagkey_tokens(self, typ, tokens):
+        """
+        see AbstractRoffTokenizer.simple_tagkey_tokens
+        """
+        # Usually the name and value follow directly and fit in one
+        # chunk, so their positions are found in the chunk and the
+        # stream is only moved once, after the value.
+        stream = self.stream
+        start = stream.tell()
+        buffer = stream.read(SCAN_CHUNK_SIZE)
+        name_end = buffer.find(b"\0")
+        if name_end != -1 and not buffer.startswith(b"#"):
+            value_start = name_end + 1
+            if typ == TokenKind.CHAR:
+                value_end = buffer.find(b"\0", value_start)
+                end = value_end + 1
+                kind = TokenKind.STRING_LITERAL
+            else:
+                value_end = end = value_start + token_lengths[typ]
+                if end > len(buffer):
+                    value_end = -1
+                kind = TokenKind.BINARY_NUMERIC_VALUE
+            if value_end != -1:
+                tokens.append(Token(TokenKind.NAME, start, start + name_end))
+                tokens.append(Token(kind, start + value_start, start + value_end))
+                stream.seek(start + end)
+                return
+        stream.seek(start)
+        tokens.append(self.match_name())
         # We do not use binary_delimited here because in the binary format it is
         # not possible to know whether you have a comment or a value starting with
         # b'#' Therefore we assume that no comments occur when we expect a value
-        yield from self.tokenize_value(type_token.kind)()
+        if typ == TokenKind.CHAR:
+            tokens.append(self.match_string(TokenKind.STRING_LITERAL))
+        else:
+            start, end = self.skip_bytes(token_lengths[typ])
+            tokens.append(Token(TokenKind.BINARY_NUMERIC_VALUE, start, end))
 
     def tokenize_delimiter(self):
         start = self.stream.tell()
@@ -209,7 +404,7 @@ class BinaryRoffBodyTokenizer(AbstractRoffBodyTokenizer):
         return iter([])
 
     def tokenize_end_of_file(self):
-        yield from repeated(self.tokenize_comment)()
+        yield from self.tokenize_comments()
         start = self.stream.tell()
         r = self.stream.read(1)
         if r:
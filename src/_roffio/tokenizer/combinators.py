@@ -27,11 +27,12 @@ def one_of(*tokenizers):
                 did_yield = True
                 break
             except TokenizationError as err:
-                errors.append(str(err))
+                # The errors are only formatted if all tokenizers fail.
+                errors.append(err)
 
         if not did_yield:
             raise TokenizationError(
-                "Tokenization failed, due to one of\n*" + ("\n*".join(errors))
+                "Tokenization failed, due to one of\n*" + ("\n*".join(map(str, errors)))
             )
 
     return one_of_tokenizer
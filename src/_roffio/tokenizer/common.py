@@ -1,3 +1,5 @@
+import io
+
 from _roffio.tokenizer.errors import TokenizationError
 from _roffio.tokenizer.token import Token
 
@@ -14,6 +16,9 @@ def tokenize_word(stream, word, kind):
     :param kind: The kind of token yielded by the tokenizer.
     """
     word_len = len(word)
+    # Failing to match is expected when used with one_of,
+    # so the message is partially formatted up front.
+    did_not_match = f" did not match {word}"
 
     def word_tokenizer():
         start = stream.tell()
@@ -24,6 +29,98 @@ def tokenize_word(stream, word, kind):
             yield Token(kind, end - word_len, end)
         else:
             stream.seek(start)
-            raise TokenizationError(f"Token {repr(token)} did not match {word}")
+            raise TokenizationError("Token " + repr(token) + did_not_match)
 
     return word_tokenizer
+
+
+# The number of characters read at a time when scanning
+# for a pattern, see scan.
+SCAN_CHUNK_SIZE = 256
+
+# The number of bytes or characters read at a time when
+# tokenizing the values of an array.
+ARRAY_CHUNK_SIZE = 1 << 16
+
+
+def has_offset_positions(stream):
+    """
+    Whether positions in the stream are offsets, ie. whether
+    stream.seek(stream.tell() + n) skips n bytes or characters ahead.
+    This is the case for byte streams and io.StringIO, but in general not
+    text streams, where tell() returns an opaque number.
+    """
+    return isinstance(stream, (io.StringIO, io.BufferedIOBase, io.RawIOBase))
+
+
+def advance(stream, start, length, offset_positions):
+    """
+    Position the stream length bytes or characters after start.
+    :param offset_positions: Whether stream has offset positions,
+        see has_offset_positions. If not, the stream is read to get
+        to the new position.
+    """
+    if offset_positions:
+        stream.seek(start + length)
+    else:
+        stream.seek(start)
+        stream.read(length)
+
+
+def scan(stream, pattern, offset_positions=False, start=None):
+    """
+    Match a compiled regular expression at the current position of
+    the stream. The stream is read in chunks rather than one character
+    at a time. If the match reaches the end of what was read, more is
+    read until the match ends before the end or the stream is exhausted.
+    This means that patterns should match as soon as the first character
+    is correct (ie. '#[^#]*#?' rather than '#[^#]*#' for comments) so that
+    a failed match is detected without reading ahead.
+
+    :param stream: The stream to scan, either a text or a byte stream
+        matching the type of pattern.
+    :param pattern: A compiled regular expression.
+    :param offset_positions: Whether stream has offset positions,
+        see has_offset_positions.
+    :param start: The current position of the stream, if the caller
+        already has it from stream.tell().
+    :returns: The match object, with the stream positioned after
+        the match, or None, with the stream left in its original position.
+    """
+    if start is None:
+        start = stream.tell()
+    chunk_size = SCAN_CHUNK_SIZE
+    buffer = stream.read(chunk_size)
+    match = pattern.match(buffer)
+    while match is not None and match.end() == len(buffer):
+        chunk_size *= 2
+        more = stream.read(chunk_size)
+        if not more:
+            break
+        buffer += more
+        match = pattern.match(buffer)
+    if match is None:
+        stream.seek(start)
+    else:
+        advance(stream, start, match.end(), offset_positions)
+    return match
+
+
+def skip(stream, pattern, offset_positions=False):
+    """
+    Skip past the match of a pattern at the start of the stream,
+    except for its "incomplete" group if matched. The incomplete
+    group allows matching incomplete tokens at the end of the pattern,
+    so that scan reads more when such a token reaches the end
+    of the read chunk, see scan.
+
+    :param stream: The stream to scan.
+    :param pattern: A compiled regular expression,
+        which always matches and has a group named "incomplete".
+    :param offset_positions: Whether stream has offset positions,
+        see has_offset_positions.
+    """
+    start = stream.tell()
+    match = scan(stream, pattern, offset_positions, start)
+    if match.group("incomplete") is not None:
+        advance(stream, start, match.start("incomplete"), offset_positions)
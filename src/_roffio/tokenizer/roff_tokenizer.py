@@ -4,28 +4,36 @@ from _roffio.tokenizer.text_roff_body_tokenizer import TextRoffBodyTokenizer
 from _roffio.tokenizer.token import Token
 from _roffio.tokenizer.token_kind import TokenKind
 
+# The header is read as bytes from binary streams and as str from
+# text streams, and the kind of file must match the kind of stream.
+header_kinds = {
+    b"roff-bin": TokenKind.ROFF_BIN,
+    "roff-asc": TokenKind.ROFF_ASC,
+}
+wrong_mode_messages = {
+    b"roff-asc": "Ascii formatted roff file was opened in binary mode!",
+    "roff-bin": "Binary formatted roff file was opened in text mode!",
+}
+
 
 def tokenize_header(stream):
     start = stream.tell()
 
     header = stream.read(8)
-    if header == b"roff-bin":
+    kind = header_kinds.get(header)
+    if kind is None:
+        if header in wrong_mode_messages:
+            raise WrongFileModeError(wrong_mode_messages[header])
+        stream.seek(start)
+        raise TokenizationError(f"Did not find roff header, got {header}.")
+    if kind == TokenKind.ROFF_BIN:
         read_char = stream.read(1)
         if read_char != b"\0":
             stream.seek(start)
             raise TokenizationError(
                 f"Expected delimiter after header token got {read_char}"
             )
-        yield Token(TokenKind.ROFF_BIN, start, start + 8)
-    elif header == "roff-asc":
-        yield Token(TokenKind.ROFF_ASC, start, start + 8)
-    elif header == b"roff-asc":
-        raise WrongFileModeError("Ascii formatted roff file was opened in binary mode!")
-    elif header == "roff-bin":
-        raise WrongFileModeError("Binary formatted roff file was opened in text mode!")
-    else:
-        stream.seek(start)
-        raise TokenizationError(f"Did not find roff header, got {header}.")
+    yield Token(kind, start, start + 8)
 
 
 class RoffTokenizer:
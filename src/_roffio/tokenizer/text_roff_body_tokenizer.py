@@ -1,12 +1,82 @@
-from functools import cached_property
+import re
+from functools import cached_property, lru_cache
 
 from _roffio.tokenizer.abstract_roff_body_tokenizer import AbstractRoffBodyTokenizer
-from _roffio.tokenizer.combinators import bind, one_of, repeated
-from _roffio.tokenizer.common import tokenize_word
+from _roffio.tokenizer.combinators import repeated
+from _roffio.tokenizer.common import (
+    ARRAY_CHUNK_SIZE,
+    has_offset_positions,
+    scan,
+    skip,
+)
 from _roffio.tokenizer.errors import TokenizationError
 from _roffio.tokenizer.token import Token
 from _roffio.tokenizer.token_kind import TokenKind
 
+# Patterns for the tokens scanned from text roff files, see
+# _roffio.tokenizer.common.scan. The comment and string literal
+# patterns also match when the closing character is missing so that
+# we can report reaching the end of the stream.
+space_pattern = re.compile(r"\s+")
+comment_pattern = re.compile(r"#[^#]*#?")
+string_literal_pattern = re.compile(r'"[^"]*"?')
+# Numeric values are ascii digits, signs, decimal points and exponents,
+# an explicit character set is faster to match than the unicode \d.
+numeric_value_pattern = re.compile(r"[0-9-][0-9.eE+-]*")
+name_pattern = re.compile(r"\S+")
+delimiter_pattern = re.compile(r"(?:\s|#[^#]*#)*(?P<incomplete>#[^#]*)?")
+value_pattern = re.compile(
+    f"{string_literal_pattern.pattern}|{numeric_value_pattern.pattern}"
+)
+
+# The name and value of a simple tagkey with their delimiters, so that
+# both are scanned at once, see delimited. The name is also matched
+# atomically, so that it is not shortened to let the value match.
+name_value_pattern = re.compile(
+    r"(?=(?P<name_delimiter>(?:\s|#[^#]*#)*))(?P=name_delimiter)"
+    r"(?!#)(?=(?P<name>\S+))(?P=name)"
+    r"(?=(?P<value_delimiter>(?:\s|#[^#]*#)*))(?P=value_delimiter)"
+    f"(?!#)(?P<value>{value_pattern.pattern})"
+)
+
+
+@lru_cache(maxsize=None)
+def delimited(pattern):
+    """
+    :param pattern: One of the token patterns above.
+    :returns: A pattern matching any delimiters followed by the token
+        in the group named "token", so that both can be scanned at once.
+        The delimiters are matched atomically (written with a lookahead
+        and a backreference), ie. pattern is not tried at parts of the
+        delimiters, such as the comment '# a #' as a name. The token
+        may not start with '#', as that is the start of a comment
+        which did not fit in the scanned chunk.
+    """
+    return re.compile(
+        r"(?=(?P<delimiter>(?:\s|#[^#]*#)*))(?P=delimiter)"
+        f"(?!#)(?P<token>{pattern.pattern})"
+    )
+
+
+@lru_cache(maxsize=None)
+def keyword_matching(kinds):
+    """
+    The keyword tables are the same for every tokenizer,
+    so they are built once for each set of keywords matched.
+
+    :param kinds: Tuple of keyword token kinds.
+    :returns: Tuple of a pattern matching one of the keywords, the
+        dictionary from keyword to its kind, and the start of the
+        message for a failed match.
+    """
+    keywords = {TokenKind.keywords()[kind]: kind for kind in kinds}
+    pattern = re.compile("|".join(map(re.escape, keywords)))
+    # Failing to match is expected when trying alternatives,
+    # such as another tagkey or the endtag, so the message is
+    # formatted up front rather than for every failure.
+    expected = f"Expected one of {list(keywords)} at "
+    return pattern, keywords, expected
+
 
 class TextRoffBodyTokenizer(AbstractRoffBodyTokenizer):
     def __init__(self, stream):
@@ -14,32 +84,79 @@ class TextRoffBodyTokenizer(AbstractRoffBodyTokenizer):
         :param stream: A byte stream containing roff data.
         """
         self._stream = stream
+        self.offset_positions = has_offset_positions(stream)
 
-    @property
     def tokenize_delimiter(self):
-        return repeated(one_of(self.tokenize_comment, self.tokenize_space))
+        """
+        Tokenize any number of spaces and comments, the same as
+        repeated(one_of(self.tokenize_comment, self.tokenize_space))
+        but without raising TokenizationError at the end.
+        """
+        skip(self.stream, delimiter_pattern, self.offset_positions)
+        return iter([])
 
     @property
     def stream(self):
         return self._stream
 
+    def scan_delimited(self, pattern):
+        """
+        Tokenize any delimiters and then match the given token pattern,
+        see scan.
+        :param pattern: One of the token patterns above.
+        :returns: Tuple of the start of the token and the matched
+            string, or None in place of the string if there was no match.
+        """
+        stream = self.stream
+        if self.offset_positions:
+            start = stream.tell()
+            match = scan(stream, delimited(pattern), offset_positions=True, start=start)
+            if match is not None:
+                return start + match.start("token"), match.group("token")
+            # The delimiters may have been longer than the chunk
+            # scanned, so try again with the delimiters on their own.
+        self.tokenize_delimiter()
+        start = stream.tell()
+        match = scan(stream, pattern, self.offset_positions, start)
+        return start, (None if match is None else match.group())
+
     @cached_property
     def tokenize_keyword(self):
         return {
-            kw_kind: bind(
-                self.tokenize_delimiter,
-                tokenize_word(self.stream, kw, kw_kind),
-            )
-            for kw_kind, kw in TokenKind.keywords().items()
+            kind: self.tokenize_keyword_of((kind,)) for kind in TokenKind.keywords()
         }
 
-    @property
-    def tokenize_array_size(self):
-        return self.tokenize_numeric_value
+    def match_keyword_of(self, kinds):
+        pattern, keywords, expected = keyword_matching(tuple(kinds))
+
+        def match_keyword():
+            start, keyword = self.scan_delimited(pattern)
+            if keyword is None:
+                raise TokenizationError(expected + str(start))
+            return Token(keywords[keyword], start, start + len(keyword))
+
+        return match_keyword
+
+    def match_array_size(self):
+        return self.match_numeric_value()
 
-    @property
     def tokenize_value(self):
-        return one_of(self.tokenize_numeric_value, self.tokenize_string_literal)
+        """
+        Tokenize either a string literal or a numeric value,
+        depending on whether the value starts with a quote.
+        """
+        yield self.match_value()
+
+    def match_value(self):
+        """
+        Take a value from the stream, see tokenize_value.
+        """
+        start, value = self.scan_delimited(value_pattern)
+        if value is None:
+            raise TokenizationError(f"Expected value at {start}")
+        if value.startswith('"'):
+            return self.string_literal_token(start, value)
+        return Token(TokenKind.NUMERIC_VALUE, start, start + len(value))
 
     def swap_endianess(self):
         pass
@@ -50,20 +167,16 @@ class TextRoffBodyTokenizer(AbstractRoffBodyTokenizer):
         Token(TokenKind.NUMERIC_VALUE, 0, 3) for stream
         containing "1.0".
         """
-        yield from self.tokenize_delimiter()
-        start = self.stream.tell()
-        end = start
-        read_char = self.stream.read(1)
-        if read_char and read_char.isnumeric() or read_char == "-":
-            while read_char and (read_char.isnumeric() or read_char in ".eE+-"):
-                end = self.stream.tell()
-                read_char = self.stream.read(1)
-        if end - start < 1:
-            self.stream.seek(start)
+        yield self.match_numeric_value()
+
+    def match_numeric_value(self):
+        """
+        Take a numeric value from the stream, see tokenize_numeric_value.
+        """
+        start, value = self.scan_delimited(numeric_value_pattern)
+        if value is None:
             raise TokenizationError(f"Expected numeric value at {start}")
-        else:
-            self.stream.seek(end)
-            yield Token(TokenKind.NUMERIC_VALUE, start, end)
+        return Token(TokenKind.NUMERIC_VALUE, start, start + len(value))
 
     def tokenize_string_literal(self):
         """
@@ -71,25 +184,24 @@ class TextRoffBodyTokenizer(AbstractRoffBodyTokenizer):
         Token(TokenKind.STRING_LITERAL, 1, 7) for stream
         containing '"string"'.
         """
-        yield from self.tokenize_delimiter()
-        start = self.stream.tell()
-        read_char = self.stream.read(1)
-        if read_char == '"':
-            literal_start = self.stream.tell()
-            read_char = self.stream.read(1)
-            literal_end = self.stream.tell()
-            while read_char and read_char not in '"':
-                literal_end = self.stream.tell()
-                read_char = self.stream.read(1)
-            if not read_char:
-                self.stream.seek(start)
-                raise TokenizationError(
-                    "Reached end of stream while reading string literal"
-                )
-            yield Token(TokenKind.STRING_LITERAL, literal_start, literal_end)
-        else:
-            self.stream.seek(start)
+        start, literal = self.scan_delimited(string_literal_pattern)
+        if literal is None:
             raise TokenizationError(f"Expected string at {start}")
+        yield self.string_literal_token(start, literal)
+
+    def string_literal_token(self, start, literal):
+        """
+        :param start: The start of the string literal in the stream.
+        :param literal: The match of string_literal_pattern at start.
+        :returns: The token for the string literal, excluding quotes.
+        """
+        end = start + len(literal)
+        if end - start < 2 or not literal.endswith('"'):
+            self.stream.seek(start)
+            raise TokenizationError(
+                "Reached end of stream while reading string literal"
+            )
+        return Token(TokenKind.STRING_LITERAL, start + 1, end - 1)
 
     def tokenize_comment(self):
         """
@@ -100,61 +212,117 @@ class TextRoffBodyTokenizer(AbstractRoffBodyTokenizer):
 
         """
         start = self.stream.tell()
-        read_char = self.stream.read(1)
-        if read_char == "#":
-            read_char = self.stream.read(1)
-            while read_char and read_char != "#":
-                read_char = self.stream.read(1)
-            if not read_char:
-                self.stream.seek(start)
-                raise TokenizationError("Reached end of stream while reading comment")
-            return iter([])
-        else:
-            self.stream.seek(start)
+        match = scan(self.stream, comment_pattern, self.offset_positions, start)
+        if match is None:
             raise TokenizationError(f"Expected comment at {start}")
+        if match.end() < 2 or not match.group().endswith("#"):
+            self.stream.seek(start)
+            raise TokenizationError("Reached end of stream while reading comment")
+        return iter([])
 
     def tokenize_array_data(self, element_type, num_values_token):
         """
         see AbstractRoffTokenizer.tokenize_array_data.
         """
+        if self.offset_positions:
+            yield from self.scan_array_values()
         yield from repeated(self.tokenize_value)()
 
-    def tokenize_simple_tagkey(self):
+    def scan_array_values(self):
         """
-        see AbstractRoffTokenizer.tokenize_simple_tagkey.
+        Tokenize consecutive values by matching them one after the other
+        in chunks read from the stream, rather than scanning the stream
+        for each value. Stops, with the stream positioned after the last
+        value, at anything which is not certainly a complete value
+        (including the end of the stream), leaving that to
+        tokenize_value.
         """
-        yield from self.tokenize_simple_type()
-        yield from self.tokenize_name()
-        yield from self.tokenize_value()
-
-    def tokenize_name(self):
-        yield from self.tokenize_delimiter()
+        stream = self.stream
+        match_value = delimited(value_pattern).match
+        chunk_size = ARRAY_CHUNK_SIZE
+        base = stream.tell()
+        buffer = stream.read(chunk_size)
+        pos = 0
+        while True:
+            match = match_value(buffer, pos)
+            if match is None or match.end() == len(buffer):
+                if len(buffer) < chunk_size or (
+                    match is None and not self.reaches_end(buffer, pos)
+                ):
+                    break
+                # The value or delimiters may continue after the
+                # chunk, so read again from the current position.
+                if pos == 0:
+                    chunk_size *= 2
+                base += pos
+                stream.seek(base)
+                buffer = stream.read(chunk_size)
+                pos = 0
+                continue
+            start, end = match.span("token")
+            if buffer[start] == '"':
+                if end - start < 2 or buffer[end - 1] != '"':
+                    break
+                yield Token(TokenKind.STRING_LITERAL, base + start + 1, base + end - 1)
+            else:
+                yield Token(TokenKind.NUMERIC_VALUE, base + start, base + end)
+            pos = end
+        stream.seek(base + pos)
 
-        start = self.stream.tell()
-        length = 0
+    @staticmethod
+    def reaches_end(buffer, pos):
+        """
+        :returns: Whether the delimiters at pos in buffer reach
+            the end of buffer, possibly with an unterminated comment.
+        """
+        return delimiter_pattern.match(buffer, pos).end() == len(buffer)
 
-        read_char = self.stream.read(1)
-        while read_char and not read_char.isspace():
-            length += 1
-            read_char = self.stream.read(1)
+    def simple_tagkey_tokens(self, typ, tokens):
+        """
+        see AbstractRoffTokenizer.simple_tagkey_tokens.
+        """
+        if self.offset_positions:
+            stream = self.stream
+            start = stream.tell()
+            match = scan(stream, name_value_pattern, offset_positions=True, start=start)
+            if match is not None:
+                value = match.group("value")
+                value_start, value_end = match.span("value")
+                if not value.startswith('"'):
+                    kind = TokenKind.NUMERIC_VALUE
+                elif len(value) > 1 and value.endswith('"'):
+                    kind = TokenKind.STRING_LITERAL
+                    value_start += 1
+                    value_end -= 1
+                else:
+                    kind = None
+                if kind is not None:
+                    name_start, name_end = match.span("name")
+                    tokens.append(
+                        Token(TokenKind.NAME, start + name_start, start + name_end)
+                    )
+                    tokens.append(Token(kind, start + value_start, start + value_end))
+                    return
+                stream.seek(start)
+            # Otherwise, take the name and value one at a time to
+            # handle long delimiters and report errors.
+        tokens.append(self.match_name())
+        tokens.append(self.match_value())
 
-        if length < 1:
-            self.stream.seek(start)
+    def match_name(self):
+        """
+        Take a name from the stream, see tokenize_name.
+        """
+        start, name = self.scan_delimited(name_pattern)
+        if name is None:
             raise TokenizationError(f"could not tokenize name at {start}")
 
-        yield Token(TokenKind.NAME, start, start + length)
+        return Token(TokenKind.NAME, start, start + len(name))
 
     def tokenize_space(self):
         start = self.stream.tell()
-        read_char = self.stream.read(1)
-        if not read_char.isspace():
-            self.stream.seek(start)
-            raise TokenizationError(f"Expected space at start, got {read_char}")
-
-        while read_char.isspace():
-            first_non_space = self.stream.tell()
-            read_char = self.stream.read(1)
-        self.stream.seek(first_non_space)
+        if scan(self.stream, space_pattern, self.offset_positions, start) is None:
+            raise TokenizationError(f"Expected space at {start}")
         return iter([])
 
     def tokenize_end_of_file(self):
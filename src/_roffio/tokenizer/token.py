@@ -9,6 +9,10 @@ class Token:
     A token in a roff file. See README.md for description of roff format.
     """
 
+    # A token is created for every keyword, name and value in a file,
+    # slots make them smaller and faster to create.
+    __slots__ = ("kind", "start", "end")
+
     kind: TokenKind
     start: int
     end: int
@@ -1,4 +1,5 @@
 from enum import Enum, auto, unique
+from types import MappingProxyType
 
 
 @unique
@@ -20,29 +21,47 @@ class TokenKind(Enum):
     ARRAY = auto()
     ARRAYBLOB = auto()
 
+    # Token kinds are looked up in sets and dicts for every token,
+    # and the default Enum.__hash__ is a python level function.
+    # Members are singletons compared by identity, so the identity
+    # hash is consistent with equality and is computed in C.
+    __hash__ = object.__hash__
+
+    # The keyword tables are built once, below the class, as they are
+    # looked up whenever tokenizers and parsers are set up.
     @classmethod
     def simple_types(cls):
-        return (
-            cls.CHAR,
-            cls.BOOL,
-            cls.BYTE,
-            cls.INT,
-            cls.FLOAT,
-            cls.DOUBLE,
-        )
+        return _simple_types
 
     @classmethod
     def keywords(cls):
-        return {
-            cls.ROFF_BIN: "roff-bin",
-            cls.ROFF_ASC: "roff-asc",
-            cls.TAG: "tag",
-            cls.ENDTAG: "endtag",
-            cls.CHAR: "char",
-            cls.BOOL: "bool",
-            cls.BYTE: "byte",
-            cls.INT: "int",
-            cls.FLOAT: "float",
-            cls.DOUBLE: "double",
-            cls.ARRAY: "array",
-        }
+        """
+        :returns: Read-only mapping from keyword token kinds to their keyword.
+        """
+        return _keywords
+
+
+_simple_types = (
+    TokenKind.CHAR,
+    TokenKind.BOOL,
+    TokenKind.BYTE,
+    TokenKind.INT,
+    TokenKind.FLOAT,
+    TokenKind.DOUBLE,
+)
+
+_keywords = MappingProxyType(
+    {
+        TokenKind.ROFF_BIN: "roff-bin",
+        TokenKind.ROFF_ASC: "roff-asc",
+        TokenKind.TAG: "tag",
+        TokenKind.ENDTAG: "endtag",
+        TokenKind.CHAR: "char",
+        TokenKind.BOOL: "bool",
+        TokenKind.BYTE: "byte",
+        TokenKind.INT: "int",
+        TokenKind.FLOAT: "float",
+        TokenKind.DOUBLE: "double",
+        TokenKind.ARRAY: "array",
+    }
+)
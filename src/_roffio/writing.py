@@ -1,9 +1,13 @@
+import io
 import pathlib
+import re
+import struct
 import warnings
 from collections import OrderedDict
 from datetime import datetime
 from enum import Enum, unique
-from functools import wraps
+from functools import lru_cache
+from itertools import chain
 
 import numpy as np
 
@@ -14,7 +18,27 @@ class RoffWriteError(Exception):
     pass
 
 
+# The headers and creator comments written at the start of files.
+creator_comment = f"#Creator: roffio, version {roffio_version}#"
+ascii_header = "roff-asc\n#ROFF file#\n" + creator_comment + "\n"
+binary_header = b"roff-bin\0#ROFF file#\0" + creator_comment.encode("ascii") + b"\0"
+
+
+# The roff types of python scalars, looked up by exact type before
+# falling back to isinstance checks for subclasses and numpy values.
+python_roff_types = {
+    str: "char",
+    bool: "bool",
+    bytes: "byte",
+    int: "int",
+    float: "double",
+}
+
+
 def type_string(value):
+    type_str = python_roff_types.get(type(value))
+    if type_str is not None:
+        return type_str
     if isinstance(value, str):
         return "char"
     if isinstance(value, bool):
@@ -45,41 +69,74 @@ def numpy_to_roff_dtype(dtyp):
     raise ValueError(f"Could not find suitable roff type for numpy type {dtyp}")
 
 
-def takes_stream(i, mode):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            if (
-                len(args) > i
-                and args[i] is not None
-                and isinstance(args[i], (str, pathlib.Path))
-            ):
-                with open(args[i], mode) as f:
-                    return func(*args[:i], f, *args[i + 1 :], **kwargs)
-            else:
-                return func(*args, **kwargs)
+def key_value_pairs(values):
+    """
+    :param values: A dictionary, or any object with an items method,
+        or an iterable of (key, value) pairs.
+    :returns: An iterable of the (key, value) pairs of values.
+    """
+    items = getattr(values, "items", None)
+    return items() if items is not None else values
+
+
+# Buffer size for writing to unbuffered streams, see write_filelike.
+write_buffer_size = 1 << 20
+
+
+def write_filelike(filelike, mode, write_stream, values):
+    """
+    Calls write_stream(file_stream, values) with the given file-like opened as
+    a stream.
+    :param filelike: A file-like object, (string to path, pathlib.Path or opened stream).
+    :param mode: The mode to open paths with.
+    """
+    if isinstance(filelike, (str, pathlib.Path)):
+        with open(filelike, mode) as f:
+            write_stream(f, values)
+    elif "b" in mode and isinstance(filelike, io.RawIOBase):
+        # Unbuffered streams would otherwise get a system
+        # call for each of the many small writes.
+        f = io.BufferedWriter(filelike, buffer_size=write_buffer_size)
+        try:
+            write_stream(f, values)
+        finally:
+            f.flush()
+            # Leaves the given stream open
+            f.detach()
+    else:
+        write_stream(filelike, values)
 
-        return wrapper
 
-    return decorator
+# The numpy scalar types of each fixed size roff type except byte,
+# as byte values are given as bytes, see cast_to_roff.
+roff_scalar_types = {
+    "bool": np.byte,
+    "int": np.int32,
+    "float": np.float32,
+    "double": np.float64,
+}
 
 
 def cast_to_roff(value, type_str):
-    if type_str == "bool":
-        return np.byte(value)
     if type_str == "byte":
         return value
-    if type_str == "int":
-        return np.int32(value)
-    if type_str == "float":
-        return np.float32(value)
-    if type_str == "double":
-        return np.float64(value)
+    return roff_scalar_types[type_str](value)
+
+
+# The dtypes of arrays in roff files, which are written little-endian.
+roff_array_dtypes = tuple(
+    np.dtype(dtype).newbyteorder("<")
+    for dtype in (np.bool_, np.uint8, np.int32, np.float32, np.float64)
+)
 
 
 def cast_array_to_roff(value):
-    if value.dtype in [np.bool_, np.int32, np.uint8, np.float32, np.float64]:
+    if value.dtype in roff_array_dtypes:
         return value
+    little_endian = value.dtype.newbyteorder("<")
+    if little_endian in roff_array_dtypes:
+        # Only the byte order differs, which loses nothing
+        return value.astype(little_endian)
     elif value.dtype == np.int8:
         result_dtype = np.uint8
     elif np.issubdtype(value.dtype, np.integer):
@@ -93,110 +150,226 @@ def cast_array_to_roff(value):
         f"casting array dtype {value.dtype} to {result_dtype}",
         stacklevel=1,
     )
-    return value.astype(result_dtype)
+    return value.astype(np.dtype(result_dtype).newbyteorder("<"))
 
 
-def write_binary_string(stream, string):
+def binary_string(string):
+    """
+    :returns: The given string as a zero-terminated binary roff string.
+    """
     if "\0" in string:
         raise RoffWriteError(
             "char values, tag names and key names "
             "cannot contain zero-character in binary roff-format.\n"
             f"Found {string}"
         )
-    stream.write(string.encode("ascii"))
-    stream.write(b"\0")
+    return string.encode("ascii") + b"\0"
 
 
-def write_binary_value(stream, value, type_str):
+@lru_cache(maxsize=4096)
+def binary_name(name):
+    """
+    :returns: The given tag or key name as a zero-terminated binary roff string.
+        Files repeat a few names many times, so these are cached.
+    """
+    return binary_string(name)
+
+
+# Packs scalars of the fixed size roff types, which gives the
+# same bytes as cast_to_roff without creating numpy scalars.
+scalar_packers = {
+    "bool": struct.Struct("<?").pack,
+    "int": struct.Struct("<i").pack,
+    "float": struct.Struct("<f").pack,
+    "double": struct.Struct("<d").pack,
+}
+
+
+def binary_value(value, type_str):
+    """
+    :returns: The bytes of the given value of the given
+        roff type in a binary roff file.
+    """
     if isinstance(value, str):
-        write_binary_string(stream, value)
+        return binary_string(value)
     elif type_str == "byte" and isinstance(value, bytes):
-        stream.write(value)
-    else:
-        stream.write(cast_to_roff(value, type_str).tobytes())
+        return value
+    pack = scalar_packers.get(type_str)
+    if pack is not None:
+        try:
+            return pack(value)
+        except (struct.error, OverflowError):
+            # cast_to_roff decides how out of range values are handled
+            pass
+    return cast_to_roff(value, type_str).tobytes()
 
 
-def write_ascii_value(stream, value, type_str):
+def write_binary_string(stream, string):
+    stream.write(binary_string(string))
+
+
+def write_binary_value(stream, value, type_str):
+    stream.write(binary_value(value, type_str))
+
+
+def ascii_value(value, type_str):
+    """
+    :returns: The given value of the given roff type
+        as written in an ascii roff file.
+    """
     if isinstance(value, str):
-        stream.write(f'"{value}"')
+        return f'"{value}"'
     elif type_str == "byte" and isinstance(value, bytes):
         if len(value) != 1:
             raise RoffWriteError(
                 "Bytes in roff format must have length 1 " f"found {value}"
             )
-        stream.write(str(int.from_bytes(value, "little")))
+        return str(int.from_bytes(value, "little"))
     elif type_str == "bool" and isinstance(value, bool):
-        stream.write(str(int(value)))
+        return str(int(value))
     else:
-        stream.write(str(value))
+        return str(value)
 
 
-def write_binary_tagkey(file_stream, tagkey_name, value):
-    if type(value) is np.ndarray:
-        file_stream.write(b"array\0")
-        value = cast_array_to_roff(value)
-        file_stream.write(numpy_to_roff_dtype(value.dtype).encode("ascii"))
-        file_stream.write(b"\0")
-        write_binary_string(file_stream, tagkey_name)
-        file_stream.write(len(value).to_bytes(4, "little"))
-        file_stream.write(value.tobytes())
-    elif isinstance(value, bytes) and len(value) > 1:
-        # Iterating over bytes gives ints so
-        # becomes a special case
-        file_stream.write(b"array\0byte\0")
-        write_binary_string(file_stream, tagkey_name)
-        file_stream.write(len(value).to_bytes(4, "little"))
-        file_stream.write(value)
-    elif is_array_type(value):
-        iterator = iter(value)
-        try:
-            first_value = next(iterator)
-        except StopIteration:
-            file_stream.write(b"array\0byte\0")
-            write_binary_string(file_stream, tagkey_name)
-            file_stream.write(b"\x00\x00\x00\x00")
-        else:
-            type_str = type_string(first_value)
-            file_stream.write(b"array\0")
-            file_stream.write(type_str.encode("ascii"))
-            file_stream.write(b"\0")
-            write_binary_string(file_stream, tagkey_name)
-            file_stream.write(len(value).to_bytes(4, "little"))
-            write_binary_value(file_stream, first_value, type_str)
-            for val in iterator:
-                if type_str != type_string(val):
-                    raise RoffWriteError(
-                        "Roff only allows homogenous arrays"
-                        f", found {type_string(value)} in {type_str} array"
-                    )
-                write_binary_value(file_stream, val, type_str)
+def write_ascii_value(stream, value, type_str):
+    stream.write(ascii_value(value, type_str))
+
+
+# The numpy dtypes matching the roff types of
+# python scalars, see type_string and cast_to_roff.
+list_array_dtypes = {bool: np.byte, int: np.int32, float: np.float64}
+
+# Packs the number of values of an array in binary files.
+pack_array_size = struct.Struct("<I").pack
+
+# The keyword of each roff type with its delimiter in binary files.
+binary_type_keywords = {
+    type_str: type_str.encode("ascii") + b"\0"
+    for type_str in ("char", "bool", "byte", "int", "float", "double")
+}
+
+# The array and type keywords in binary files for the
+# dtypes of arrays after cast_array_to_roff.
+binary_array_keywords = {
+    dtype: b"array\0" + binary_type_keywords[numpy_to_roff_dtype(dtype)]
+    for dtype in roff_array_dtypes
+}
+
+
+def write_binary_array_tagkey(file_stream, tagkey_name, value):
+    # The values are written from the array memory
+    # without copying them to bytes first.
+    value = np.ascontiguousarray(cast_array_to_roff(value))
+    keywords = binary_array_keywords.get(value.dtype)
+    if keywords is None:
+        keywords = b"array\0" + binary_type_keywords[numpy_to_roff_dtype(value.dtype)]
+    file_stream.write(keywords + binary_name(tagkey_name) + pack_array_size(len(value)))
+    file_stream.write(memoryview(value).cast("B"))
+
+
+def write_binary_bytes_tagkey(file_stream, tagkey_name, value):
+    # Iterating over bytes gives ints so
+    # becomes a special case
+    if len(value) == 1:
+        write_binary_scalar_tagkey(file_stream, tagkey_name, value)
     else:
-        type_str = type_string(value)
-        file_stream.write(type_str.encode("ascii"))
-        file_stream.write(b"\0")
-        write_binary_string(file_stream, tagkey_name)
-        write_binary_value(file_stream, value, type_str)
+        file_stream.write(
+            b"array\0byte\0"
+            + binary_name(tagkey_name)
+            + pack_array_size(len(value))
+            + value
+        )
+
+
+def write_binary_list_tagkey(file_stream, tagkey_name, value):
+    iterator = iter(value)
+    try:
+        first_value = next(iterator)
+    except StopIteration:
+        file_stream.write(
+            b"array\0byte\0" + binary_name(tagkey_name) + b"\x00\x00\x00\x00"
+        )
+        return
+    type_str = type_string(first_value)
+    first_type = type(first_value)
+    dtype = list_array_dtypes.get(first_type)
+    if dtype is not None and set(map(type, value)) == {first_type}:
+        # A list of python numbers of the same type is
+        # converted by numpy at once rather than per value.
+        file_stream.write(
+            b"array\0"
+            + binary_type_keywords[type_str]
+            + binary_name(tagkey_name)
+            + pack_array_size(len(value))
+            + np.fromiter(value, dtype, count=len(value)).tobytes()
+        )
+        return
+    parts = [
+        b"array\0",
+        binary_type_keywords[type_str],
+        binary_name(tagkey_name),
+        pack_array_size(len(value)),
+        binary_value(first_value, type_str),
+    ]
+    for val in iterator:
+        # Values of the same type as the first have the same type string
+        if type(val) is not first_type and type_str != type_string(val):
+            raise RoffWriteError(
+                "Roff only allows homogenous arrays"
+                f", found {type_string(val)} in {type_str} array"
+            )
+        parts.append(binary_value(val, type_str))
+    file_stream.write(b"".join(parts))
 
 
-@takes_stream(0, "wb")
-def write_binary_roff(file_stream, values):
-    file_stream.write(b"roff-bin\0")
-    file_stream.write(b"#ROFF file#\0")
-    file_stream.write(f"#Creator: roffio, version {roffio_version}#".encode("ascii"))
-    file_stream.write(b"\0")
+def write_binary_scalar_tagkey(file_stream, tagkey_name, value):
+    type_str = type_string(value)
+    file_stream.write(
+        binary_type_keywords[type_str]
+        + binary_name(tagkey_name)
+        + binary_value(value, type_str)
+    )
 
-    values_list = values.items() if hasattr(values, "items") else iter(values)
 
-    for tag_name, tag_keys in values_list:
-        file_stream.write(b"tag\0")
-        write_binary_string(file_stream, tag_name)
+# The tagkey writer for the exact type of common values,
+# other values are dispatched in write_binary_tagkey.
+binary_tagkey_writers = {
+    np.ndarray: write_binary_array_tagkey,
+    bytes: write_binary_bytes_tagkey,
+    list: write_binary_list_tagkey,
+    tuple: write_binary_list_tagkey,
+    str: write_binary_scalar_tagkey,
+    bool: write_binary_scalar_tagkey,
+    int: write_binary_scalar_tagkey,
+    float: write_binary_scalar_tagkey,
+}
 
-        if hasattr(tag_keys, "items"):
-            tag_keys_list = tag_keys.items()
+
+def write_binary_tagkey(file_stream, tagkey_name, value):
+    # Each tagkey is put together and written at once, except for
+    # the values of numpy arrays.
+    writer = binary_tagkey_writers.get(type(value))
+    if writer is None:
+        if isinstance(value, bytes):
+            writer = write_binary_bytes_tagkey
+        elif is_array_type(value):
+            writer = write_binary_list_tagkey
         else:
-            tag_keys_list = iter(tag_keys)
+            writer = write_binary_scalar_tagkey
+    writer(file_stream, tagkey_name, value)
+
+
+def write_binary_roff(filelike, values):
+    write_filelike(filelike, "wb", write_binary_roff_stream, values)
+
 
-        for tagkey_name, value in tag_keys_list:
+def write_binary_roff_stream(file_stream, values):
+    file_stream.write(binary_header)
+
+    for tag_name, tag_keys in key_value_pairs(values):
+        file_stream.write(b"tag\0" + binary_name(tag_name))
+
+        for tagkey_name, value in key_value_pairs(tag_keys):
             write_binary_tagkey(file_stream, tagkey_name, value)
 
         file_stream.write(b"endtag\0")
@@ -210,22 +383,54 @@ def is_array_type(value):
     )
 
 
+# Matches the same characters as str.isspace.
+space_pattern = re.compile(r"\s")
+
+
 def check_valid_ascii_name(name):
     if len(name) == 0:
         raise RoffWriteError("Names in roff ascii format cannot have 0 length.")
-    if any(c.isspace() for c in name):
+    if space_pattern.search(name):
         raise RoffWriteError(
             f"Names in roff ascii format cannot contain space. found '{name}'"
         )
-    if any(c == "#" for c in name):
+    if "#" in name:
         raise RoffWriteError(
             f"Names in roff ascii format cannot contain '#'. found '{name}'"
         )
 
 
+def ascii_array_values(value):
+    """
+    :param value: A one dimensional numpy array.
+    :returns: The values of the array as strings, the same as
+        given by ascii_value for each value, except that
+        booleans are written as 1 and 0.
+    """
+    if value.dtype.kind == "b":
+        value = value.astype(np.uint8)
+    elif value.dtype.kind == "f" and value.dtype != np.float64:
+        # As python floats, single precision values would be written
+        # with double precision digits, eg. 0.10000000149011612 for 0.1.
+        return map(str, value)
+    return map(str, value.tolist())
+
+
 def write_ascii_tagkey(file_stream, tagkey_name, value):
     check_valid_ascii_name(tagkey_name)
-    if is_array_type(value):
+    if (
+        type(value) is np.ndarray
+        and value.ndim == 1
+        and len(value) > 0
+        and value.dtype.kind in "biuf"
+    ):
+        # The values of numeric numpy arrays have the same type,
+        # so they are converted and written at once.
+        typ_str = numpy_to_roff_dtype(value.dtype)
+        file_stream.write(f"array {typ_str} {tagkey_name} {len(value)}\n")
+        file_stream.write("\n".join(ascii_array_values(value)))
+        file_stream.write("\n")
+    elif is_array_type(value):
         iterator = iter(value)
         try:
             first_value = next(iterator)
@@ -235,42 +440,42 @@ def write_ascii_tagkey(file_stream, tagkey_name, value):
             typ_str = type_string(first_value)
             if isinstance(value, bytes):
                 typ_str = "byte"
-            file_stream.write(f"array {typ_str} {tagkey_name} {len(value)}\n")
-            write_ascii_value(file_stream, first_value, typ_str)
-            file_stream.write("\n")
+            # The tagkey is put together and written at once
+            lines = [
+                f"array {typ_str} {tagkey_name} {len(value)}",
+                ascii_value(first_value, typ_str),
+            ]
+            first_type = type(first_value)
             for v in iterator:
-                if typ_str != type_string(v) and not isinstance(value, bytes):
+                if (
+                    type(v) is not first_type
+                    and typ_str != type_string(v)
+                    and not isinstance(value, bytes)
+                ):
                     raise RoffWriteError(
                         "Roff only allows homogenous arrays"
                         f", found {type_string(v)} in {typ_str} array"
                     )
-                write_ascii_value(file_stream, v, typ_str)
-                file_stream.write("\n")
+                lines.append(ascii_value(v, typ_str))
+            lines.append("")
+            file_stream.write("\n".join(lines))
     else:
         typ_str = type_string(value)
-        file_stream.write(f"{typ_str} {tagkey_name} ")
-        write_ascii_value(file_stream, value, typ_str)
-        file_stream.write("\n")
+        file_stream.write(f"{typ_str} {tagkey_name} {ascii_value(value, typ_str)}\n")
+
 
+def write_ascii_roff(filelike, values):
+    write_filelike(filelike, "w", write_ascii_roff_stream, values)
 
-@takes_stream(0, "w")
-def write_ascii_roff(file_stream, values):
-    file_stream.write("roff-asc\n")
-    file_stream.write("#ROFF file#\n")
-    file_stream.write(f"#Creator: roffio, version {roffio_version}#\n")
 
-    values_list = values.items() if hasattr(values, "items") else iter(values)
+def write_ascii_roff_stream(file_stream, values):
+    file_stream.write(ascii_header)
 
-    for tag_name, tag_keys in values_list:
+    for tag_name, tag_keys in key_value_pairs(values):
         file_stream.write(f"tag {tag_name}\n")
         check_valid_ascii_name(tag_name)
 
-        if hasattr(tag_keys, "items"):
-            tag_keys_list = tag_keys.items()
-        else:
-            tag_keys_list = iter(tag_keys)
-
-        for tagkey_name, value in tag_keys_list:
+        for tagkey_name, value in key_value_pairs(tag_keys):
             write_ascii_tagkey(file_stream, tagkey_name, value)
 
         file_stream.write("endtag\n")
@@ -308,15 +513,12 @@ def write(filelike, values, roff_format=Format.BINARY):
     """
     metadata_values = roff_metadata()
 
-    values_list = list(values.items()) if hasattr(values, "items") else list(values)
-
-    for k, v in values_list:
+    values_list = []
+    for k, v in key_value_pairs(values):
         if k in metadata_values:
             metadata_values[k].update(v)
-
-    values_list = list(
-        filter(lambda p: p[0] not in metadata_values and p[0] != "eof", values_list)
-    )
+        elif k != "eof":
+            values_list.append((k, v))
 
     if (
         metadata_values["version"]["major"] != 2
@@ -329,21 +531,18 @@ def write(filelike, values, roff_format=Format.BINARY):
     if set(metadata_values["version"].keys()) != {"major", "minor"}:
         raise ValueError(
             "No additional fields in the version tag is permitted, "
-            f"found {values['filedata']['version'].keys()}"
+            f"found {metadata_values['version'].keys()}"
         )
 
     if metadata_values["filedata"]["byteswaptest"] != 1:
         raise ValueError(
             "It is not possible to set the byteswaptest value in roffio.write"
-            f", found value {values['filedata']['byteswaptest']}."
+            f", found value {metadata_values['filedata']['byteswaptest']}."
             "\nUse the endianess parameter to set endianess."
         )
 
+    tags = chain(metadata_values.items(), values_list, [("eof", {})])
     if roff_format == Format.BINARY:
-        write_binary_roff(
-            filelike, list(metadata_values.items()) + values_list + [("eof", {})]
-        )
+        write_binary_roff(filelike, tags)
     else:
-        write_ascii_roff(
-            filelike, list(metadata_values.items()) + values_list + [("eof", {})]
-        )
+        write_ascii_roff(filelike, tags)
@@ -23,15 +23,15 @@ def string_literals(draw):
 
 @st.composite
 def binary_string(draw, min_size=0, max_size=10, min_char=32, max_char=126):
-    size = draw(st.integers(min_value=min_size, max_value=max_size))
-    result = b""
-    for _ in range(size):
-        # Printable non-extended ascii characters are between 32 and 126
-        result += draw(st.integers(min_value=min_char, max_value=max_char)).to_bytes(
-            1, "little"
+    # Printable non-extended ascii characters are between 32 and 126
+    characters = draw(
+        st.lists(
+            st.integers(min_value=min_char, max_value=max_char),
+            min_size=min_size,
+            max_size=max_size,
         )
-    result += b"\0"
-    return result
+    )
+    return bytes(characters) + b"\0"
 
 
 @st.composite
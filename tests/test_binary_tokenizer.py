@@ -1,7 +1,7 @@
 import io
 
 import pytest
-from hypothesis import given
+from hypothesis import given, settings
 
 import _roffio.tokenizer as rofftok
 from _roffio.parser import as_ascii
@@ -11,6 +11,7 @@ from _roffio.tokenizer.binary_roff_body_tokenizer import (
 )
 from _roffio.tokenizer.combinators import bind, repeated
 from _roffio.tokenizer.errors import TokenizationError
+from _roffio.tokenizer.token import Token
 from _roffio.tokenizer.token_kind import TokenKind
 
 from .generators.roff_file_contents import binary_file_contents
@@ -64,6 +65,20 @@ def test_tokenize_binary_string(roff_binary_body_tokenizer):
     assert token.get_value(tokenizer.stream) == b"Aroffstring"
 
 
+@pytest.mark.parametrize(
+    "kind, length",
+    [
+        (TokenKind.BOOL, 1),
+        (TokenKind.BYTE, 1),
+        (TokenKind.INT, 4),
+        (TokenKind.FLOAT, 4),
+        (TokenKind.DOUBLE, 8),
+    ],
+)
+def test_tokenlen(kind, length):
+    assert tokenlen(kind) == length
+
+
 def test_tokenlen_raises():
     with pytest.raises(TokenizationError, match="non-fixed"):
         tokenlen(TokenKind.CHAR)
@@ -197,9 +212,162 @@ def test_tokenize_tag_group(roff_binary_body_tokenizer):
 
 
 @given(binary_file_contents())
+# Each example tokenizes a whole generated file
+@settings(max_examples=50, deadline=None)
 def test_tokenize_binary_file(binary_str):
     buff = io.BytesIO(binary_str)
     tokenizer = rofftok.RoffTokenizer(buff)
+    keywords = TokenKind.keywords()
     for t in tokenizer:
-        if t.kind in TokenKind.keywords():
-            assert as_ascii(t.get_value(buff)) == TokenKind.keywords()[t.kind]
+        keyword = keywords.get(t.kind)
+        if keyword is not None:
+            assert as_ascii(t.get_value(buff)) == keyword
+
+
+def test_tokenize_string_longer_than_scan_chunk():
+    name = b"x" * 1000
+    stream = io.BytesIO(b"#" + b" " * 1000 + b"#\0" + name + b"\0")
+    tokenizer = BinaryRoffBodyTokenizer(stream)
+    token = next(tokenizer.tokenize_name())
+    assert token.get_value(stream) == name
+    assert stream.read() == b""
+
+
+@pytest.mark.parametrize("name", [b"x", b"x" * 1000])
+def test_tokenize_string_missing_terminator(name):
+    stream = io.BytesIO(name)
+    tokenizer = BinaryRoffBodyTokenizer(stream)
+    with pytest.raises(TokenizationError, match="could not tokenize string"):
+        next(tokenizer.tokenize_name())
+    assert stream.tell() == 0
+
+
+def test_tokenize_binary_char_array_longer_than_scan_chunk():
+    values = [b"x" * 300, b"", b"y" * 1000, b"z"]
+    stream = io.BytesIO(
+        b"array\0char\0x\0"
+        + len(values).to_bytes(4, "little")
+        + b"".join(v + b"\0" for v in values)
+        + b"endtag\0"
+    )
+    tokenizer = BinaryRoffBodyTokenizer(stream)
+    tokens = list(tokenizer.tokenize_array_tagkey())
+    assert [t.get_value(stream) for t in tokens[4:]] == values
+    assert stream.read() == b"endtag\0"
+
+
+@pytest.mark.parametrize("values", [[], [b""] * 3, [b"ab", b"", b"cdefghij", b"k"] * 5])
+def test_tokenize_binary_char_array_split_across_chunks(monkeypatch, values):
+    monkeypatch.setattr(
+        "_roffio.tokenizer.binary_roff_body_tokenizer.ARRAY_CHUNK_SIZE", 4
+    )
+    stream = io.BytesIO(
+        b"array\0char\0x\0"
+        + len(values).to_bytes(4, "little")
+        + b"".join(v + b"\0" for v in values)
+        + b"endtag\0"
+    )
+    tokenizer = BinaryRoffBodyTokenizer(stream)
+    tokens = list(tokenizer.tokenize_array_tagkey())
+    assert [t.get_value(stream) for t in tokens[4:]] == values
+    assert stream.read() == b"endtag\0"
+
+
+def test_tokenize_binary_char_array_missing_terminator():
+    stream = io.BytesIO(b"array\0char\0x\0\2\0\0\0a\0b")
+    tokenizer = BinaryRoffBodyTokenizer(stream)
+    with pytest.raises(TokenizationError):
+        list(tokenizer.tokenize_array_tagkey())
+
+
+@pytest.mark.parametrize(
+    "endianess, size_bytes", [("little", b"\x02\0\0\0"), ("big", b"\0\0\0\x02")]
+)
+def test_read_array_size(endianess, size_bytes):
+    stream = io.BytesIO(b"array\0int\0x\0" + size_bytes)
+    tokenizer = BinaryRoffBodyTokenizer(stream, endianess=endianess)
+    stream.seek(len(stream.getvalue()))
+    size_token = Token(TokenKind.BINARY_NUMERIC_VALUE, 12, 16)
+    assert tokenizer.read_array_size(size_token) == 2
+    assert stream.tell() == 16
+
+
+def test_tokenize_truncated_array_size():
+    stream = io.BytesIO(b"array\0int\0x\0\x02\0")
+    tokenizer = BinaryRoffBodyTokenizer(stream)
+    with pytest.raises(TokenizationError, match="end of stream"):
+        list(tokenizer.tokenize_array_tagkey())
+
+
+@pytest.mark.parametrize(
+    "comment",
+    [
+        b"",
+        b"#short#\0",
+        b"#short#",
+        b"#a#\0#b#",
+        b"#" + b" " * 1000 + b"#\0",
+        b"#" + b" " * 1000 + b"#",
+    ],
+)
+def test_tokenize_binary_keyword_after_comment(comment):
+    stream = io.BytesIO(comment + b"endtag\0")
+    tokenizer = BinaryRoffBodyTokenizer(stream)
+    token = next(tokenizer.tokenize_keyword[TokenKind.ENDTAG]())
+    assert token.kind == TokenKind.ENDTAG
+    assert token.get_value(stream) == b"endtag"
+    assert stream.read() == b""
+
+
+@pytest.mark.parametrize("comment", [b"#c#\0", b"#c#", b"#c#\0#d#"])
+def test_tokenize_binary_name_after_comment(comment):
+    stream = io.BytesIO(comment + b"x\0")
+    tokenizer = BinaryRoffBodyTokenizer(stream)
+    token = next(tokenizer.tokenize_name())
+    assert token.kind == TokenKind.NAME
+    assert token.get_value(stream) == b"x"
+
+
+def test_tagkey_tokens_appends_until_failure():
+    stream = io.BytesIO(b"int\0x\0\x01\0")
+    tokenizer = BinaryRoffBodyTokenizer(stream)
+    tokens = []
+    with pytest.raises(TokenizationError):
+        tokenizer.tagkey_tokens(tokens)
+    assert [t.kind for t in tokens] == [TokenKind.INT, TokenKind.NAME]
+
+
+def test_tokenize_comments_unterminated_longer_than_scan_chunk():
+    stream = io.BytesIO(b"#c#\0#" + b"int\0x\0\x01\0\0\0" * 1000)
+    tokenizer = BinaryRoffBodyTokenizer(stream)
+    list(tokenizer.tokenize_comments())
+    assert stream.tell() == 4
+
+
+@pytest.mark.parametrize(
+    "name, comment",
+    [
+        (b"x", b""),
+        (b"x", b"#c#\0"),
+        (b"x", b"#c#"),
+        (b"x" * 253, b""),
+        (b"x" * 300, b""),
+    ],
+)
+@pytest.mark.parametrize(
+    "type_keyword, value, kind",
+    [
+        (b"int", b"\x01\0\0\0", TokenKind.BINARY_NUMERIC_VALUE),
+        (b"char", b"abc\0", TokenKind.STRING_LITERAL),
+    ],
+)
+def test_tokenize_simple_tagkey_positions(name, comment, type_keyword, value, kind):
+    stream = io.BytesIO(type_keyword + b"\0" + comment + name + b"\0" + value + b"z")
+    tokenizer = BinaryRoffBodyTokenizer(stream)
+    tokens = list(tokenizer.tokenize_simple_tagkey())
+    assert [t.kind for t in tokens[1:]] == [TokenKind.NAME, kind]
+    assert tokens[1].get_value(stream) == name
+    if kind == TokenKind.STRING_LITERAL:
+        value = value[:-1]
+    assert tokens[2].get_value(stream) == value
+    assert stream.read() == b"z"
@@ -1,33 +1,49 @@
-from unittest.mock import MagicMock
-
+import numpy as np
 import pytest
 
 from _roffio.endianess_handler import EndianessHandler, RoffFormatError
 
 
+class FakeRoffStage:
+    """
+    Stands in for the parser and tokenizer given to EndianessHandler,
+    iterating over the given items and counting endianess swaps.
+    """
+
+    is_binary_file = True
+    endianess = "little"
+
+    def __init__(self, items=()):
+        self.items = items
+        self.swapped = 0
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def swap_endianess(self):
+        self.swapped += 1
+
+
 def test_no_filedata_warning():
-    tokenizer = MagicMock()
-    parser = MagicMock()
-    parser.__iter__.return_value = iter([("tagname", [])])
+    parser = FakeRoffStage([("tagname", [])])
+    tokenizer = FakeRoffStage()
 
     with pytest.warns(UserWarning):
         next(iter(EndianessHandler(parser, tokenizer)))
 
 
 def test_no_byteswaptest_error():
-    tokenizer = MagicMock()
-    parser = MagicMock()
-    parser.__iter__.return_value = iter([("filedata", [])])
+    parser = FakeRoffStage([("filedata", [])])
+    tokenizer = FakeRoffStage()
 
     with pytest.raises(RoffFormatError):
         next(iter(EndianessHandler(parser, tokenizer)))
 
 
 def test_double_filedata_error():
-    tokenizer = MagicMock()
-    parser = MagicMock()
     input_data = ("filedata", [("byteswaptest", 1)])
-    parser.__iter__.return_value = iter([input_data] * 2)
+    parser = FakeRoffStage([input_data] * 2)
+    tokenizer = FakeRoffStage()
 
     data_iter = iter(EndianessHandler(parser, tokenizer))
     output_data = next(data_iter)
@@ -39,14 +55,27 @@ def test_double_filedata_error():
 
 
 def test_filedata_swaps():
-    tokenizer = MagicMock()
-    parser = MagicMock()
-    parser.__iter__.return_value = iter([("filedata", [("byteswaptest", -1)])])
+    parser = FakeRoffStage([("filedata", [("byteswaptest", -1)])])
+    tokenizer = FakeRoffStage()
 
     data = next(iter(EndianessHandler(parser, tokenizer)))
 
     assert data[0] == "filedata"
     assert list(data[1]) == [("byteswaptest", 1)]
 
-    parser.swap_endianess.assert_called_once()
-    tokenizer.swap_endianess.assert_called_once()
+    assert parser.swapped == 1
+    assert tokenizer.swapped == 1
+
+
+def test_filedata_keeps_parsed_byteswaptest():
+    byteswaptest = np.int32(1)
+    parser = FakeRoffStage([("filedata", [("byteswaptest", byteswaptest)])])
+    tokenizer = FakeRoffStage()
+
+    data = next(iter(EndianessHandler(parser, tokenizer)))
+
+    tagkeys = list(data[1])
+    assert tagkeys == [("byteswaptest", byteswaptest)]
+    assert type(tagkeys[0][1]) is np.int32
+    assert parser.swapped == 0
+    assert tokenizer.swapped == 0
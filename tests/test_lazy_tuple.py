@@ -6,7 +6,7 @@ from _roffio.lazy_tuple import LazyTuple
 
 @given(st.integers(), st.integers())
 def test_values(a, b):
-    lt = LazyTuple(lambda: a, lambda: b)
+    lt = LazyTuple(a, lambda: b)
 
     assert len(lt) == 2
 
@@ -1,5 +1,6 @@
 import contextlib
 import io
+import sys
 
 import numpy as np
 import pytest
@@ -20,7 +21,7 @@ def test_parse_numeric_value_type_error():
     stream = io.StringIO()
     parser = roffparse.RoffTagKeyParser(tokens, stream, None)
     with pytest.raises(roffparse.RoffTypeError):
-        next(parser.parse_numeric_value(np.int32))
+        parser.parse_numeric_value(np.int32)
 
 
 def test_parse_numeric_value_syntax_error():
@@ -28,58 +29,63 @@ def test_parse_numeric_value_syntax_error():
     stream = io.StringIO("ERR")
     parser = roffparse.RoffTagKeyParser(tokens, stream, None)
     with pytest.raises(roffparse.RoffSyntaxError):
-        next(parser.parse_numeric_value(np.int32))
+        parser.parse_numeric_value(np.int32)
 
 
-@pytest.mark.parametrize(
-    "valuestr, valuetype, expected",
-    [
-        ("1.0", np.float32, 1.0),
-        ("1.0E+4", np.float32, 10000.0),
-        ("-1", np.int32, -1),
-        ("20", int, 20),
-        ("1", bool, True),
-        ("1", np.int8, 1),
-    ],
+numeric_ascii_values = (
+    pytest.param("1.0", np.float32, 1.0, id="float32"),
+    pytest.param("1.0E+4", np.float32, 10000.0, id="float32-exponent"),
+    pytest.param("-1", np.int32, -1, id="int32-negative"),
+    pytest.param("20", int, 20, id="int"),
+    pytest.param("1", bool, True, id="bool"),
+    pytest.param("1", np.int8, 1, id="int8"),
 )
+
+
+@pytest.mark.parametrize("valuestr, valuetype, expected", numeric_ascii_values)
 def test_parse_numeric_ascii_value(valuestr, valuetype, expected):
     tokens = iter([Token(TokenKind.NUMERIC_VALUE, 0, len(valuestr))])
     stream = io.StringIO(valuestr)
     parser = roffparse.RoffTagKeyParser(tokens, stream, None)
-    assert next(parser.parse_numeric_value(valuetype)) == expected
+    assert parser.parse_numeric_value(valuetype) == expected
+
+
+numeric_binary_values = (
+    pytest.param(np.int32, b"\x01\x00\x00\x00", 1, id="int32"),
+    pytest.param(
+        np.dtype(np.int32).newbyteorder(">"),
+        b"\x00\x00\x00\x01",
+        1,
+        id="int32-big-endian",
+    ),
+    pytest.param(np.float32, b"\x00" * 4, 0.0, id="float32"),
+    pytest.param(np.float64, b"\x00" * 8, 0.0, id="float64"),
+    pytest.param(np.int8, b"\x01", 1, id="int8"),
+    pytest.param(np.bool_, b"\x01", True, id="bool-true"),
+    pytest.param(np.bool_, b"\x00", False, id="bool-false"),
+)
 
 
-@pytest.mark.parametrize(
-    "dtype, bytevalue, expected",
-    [
-        (np.int32, b"\x01\x00\x00\x00", 1),
-        (np.dtype(np.int32).newbyteorder(">"), b"\x00\x00\x00\x01", 1),
-        (np.float32, b"\x00" * 4, 0.0),
-        (np.float64, b"\x00" * 8, 0.0),
-        (np.int8, b"\x01", 1),
-        (np.bool_, b"\x01", True),
-        (np.bool_, b"\x00", False),
-    ],
-)
+@pytest.mark.parametrize("dtype, bytevalue, expected", numeric_binary_values)
 def test_parse_numeric_binary_value(dtype, bytevalue, expected):
     tokens = iter([Token(TokenKind.BINARY_NUMERIC_VALUE, 0, len(bytevalue))])
     stream = io.BytesIO(bytevalue)
     parser = roffparse.RoffTagKeyParser(tokens, stream, None)
-    assert next(parser.parse_numeric_value(dtype)) == expected
+    assert parser.parse_numeric_value(dtype) == expected
 
 
 def test_parse_binary_string_Literal():
     tokens = iter([Token(TokenKind.STRING_LITERAL, 0, 5)])
     stream = io.BytesIO(b"hello\0")
     parser = roffparse.RoffTagKeyParser(tokens, stream, None)
-    assert next(parser.parse_string_literal()) == "hello"
+    assert parser.parse_string_literal() == "hello"
 
 
 def test_parse_ascii_string_literal():
     tokens = iter([Token(TokenKind.STRING_LITERAL, 1, 6)])
     stream = io.StringIO('"hello"')
     parser = roffparse.RoffTagKeyParser(tokens, stream, None)
-    assert next(parser.parse_string_literal()) == "hello"
+    assert parser.parse_string_literal() == "hello"
 
 
 def test_parse_one_of():
@@ -127,7 +133,7 @@ def test_parse_simple_tagkey(inp_str, expected):
     tokens = tokenizer.tokenize_simple_tagkey()
     parser = roffparse.RoffParser(tokens, stream)
     tagkey_parser = roffparse.RoffTagKeyParser(tokens, stream, parser)
-    assert next(tagkey_parser.parse_tagkey()) == expected
+    assert tagkey_parser.parse_tagkey() == expected
 
 
 @pytest.mark.parametrize(
@@ -145,7 +151,7 @@ def test_parse_array_tagkey(inp_str, expected):
     tokens = tokenizer.tokenize_array_tagkey()
     parser = roffparse.RoffParser(tokens, stream)
     tagkey_parser = roffparse.RoffTagKeyParser(tokens, stream, parser)
-    varname, array = next(tagkey_parser.parse_tagkey())
+    varname, array = tagkey_parser.parse_tagkey()
 
     assert expected[0] == varname
     assert np.array_equal(expected[1], array)
@@ -169,6 +175,24 @@ def test_parse_binary_file(binary_str):
         {t: dict(tags) for t, tags in iter(parser)}
 
 
+def tagkey_parser(input_str):
+    """
+    :param input_str: A single tagkey, in ascii format when given
+        str and in binary format when given bytes.
+    :returns: RoffTagKeyParser for the tagkey.
+    """
+    if isinstance(input_str, bytes):
+        stream = io.BytesIO(input_str)
+        tokenizer = BinaryRoffBodyTokenizer(stream)
+    else:
+        stream = io.StringIO(input_str)
+        tokenizer = TextRoffBodyTokenizer(stream)
+    tokens = tokenizer.tokenize_tagkey()
+    parser = roffparse.RoffParser(tokens, stream)
+    parser.is_binary_file = isinstance(input_str, bytes)
+    return roffparse.RoffTagKeyParser(tokens, stream, parser)
+
+
 @pytest.mark.parametrize(
     "input_str, expected, expected_type",
     [
@@ -177,23 +201,6 @@ def test_parse_binary_file(binary_str):
         ("double x 3.0", ("x", 3.0), np.float64),
         ("byte x 1", ("x", b"\x01"), bytes),
         ("bool x 1", ("x", True), bool),
-    ],
-)
-def test_parse_tagkey_ascii_types(input_str, expected, expected_type):
-    stream = io.StringIO(input_str)
-    tokenizer = TextRoffBodyTokenizer(stream)
-    tokens = tokenizer.tokenize_tagkey()
-    parser = roffparse.RoffTagKeyParser(
-        tokens, stream, roffparse.RoffParser(stream, tokens)
-    )
-    val = next(iter(parser))
-    assert val == expected
-    assert isinstance(val[1], expected_type)
-
-
-@pytest.mark.parametrize(
-    "input_str, expected, expected_type",
-    [
         (b"int\0x\0\x03\x00\x00\x00", ("x", 3), np.int32),
         (b"float\0x\0\x00\x00\x00\x00", ("x", 0.0), np.float32),
         (b"double\0x\0" + b"\x00" * 8, ("x", 0.0), np.float64),
@@ -201,67 +208,73 @@ def test_parse_tagkey_ascii_types(input_str, expected, expected_type):
         (b"bool\0x\0\x01", ("x", True), bool),
     ],
 )
-def test_parse_tagkey_binary_types(input_str, expected, expected_type):
-    stream = io.BytesIO(input_str)
-    tokenizer = BinaryRoffBodyTokenizer(stream)
-    tokens = tokenizer.tokenize_simple_tagkey()
-    parser = roffparse.RoffParser(tokens, stream)
-    parser.is_binary_file = True
-    parser = roffparse.RoffTagKeyParser(tokens, stream, parser)
-    val = next(iter(parser))
+def test_parse_tagkey_types(input_str, expected, expected_type):
+    val = next(iter(tagkey_parser(input_str)))
     assert val == expected
     assert isinstance(val[1], expected_type)
 
 
+def same_values(actual, expected):
+    """
+    :returns: Whether actual has the same dtype, shape and values as the
+        expected array, or equals the expected bytes of byte arrays.
+    """
+    if isinstance(expected, bytes):
+        return actual == expected
+    return (
+        actual.dtype == expected.dtype
+        and actual.shape == expected.shape
+        and actual.tobytes() == expected.tobytes()
+    )
+
+
+# The array tagkeys of test_parse_tagkey_array_types as (roff type, ascii
+# values, binary values, expected), the expected values are shared by both formats.
+array_tagkey_values = [
+    ("int", "1 3", b"\x01\x00\x00\x00\x03\x00\x00\x00", np.array([3], dtype=np.int32)),
+    ("float", "1 0.0", b"\x01\x00\x00\x00" + b"\x00" * 4, np.zeros(1, np.float32)),
+    ("double", "1 0.0", b"\x01\x00\x00\x00" + b"\x00" * 8, np.zeros(1, np.float64)),
+    ("byte", "2 1 2", b"\x02\x00\x00\x00\x01\x02", b"\x01\x02"),
+    ("bool", "1 1", b"\x01\x00\x00\x00\x01", np.array([True], dtype=np.bool_)),
+]
+
+
 @pytest.mark.parametrize(
     "input_str, expected",
     [
-        (
-            b"array\0int\0x\0\x01\x00\x00\x00\x03\x00\x00\x00",
-            ("x", np.array([3], dtype=np.int32)),
-        ),
-        (
-            b"array\0float\0x\0\x01\x00\x00\x00\x00\x00\x00\x00",
-            ("x", np.array([0.0], dtype=np.float32)),
-        ),
-        (
-            b"array\0double\0x\0\x01\x00\x00\x00" + b"\x00" * 8,
-            ("x", np.array([0.0], dtype=np.float64)),
-        ),
-        (b"array\0byte\0x\0\x02\x00\x00\x00\x01\x02", ("x", b"\x01\x02")),
-        (
-            b"array\0bool\0x\0\x01\x00\x00\x00\x01",
-            ("x", np.array([True], dtype=np.bool_)),
-        ),
+        (f"array {typ} x {values}", ("x", exp))
+        for typ, values, _, exp in array_tagkey_values
+    ]
+    + [
+        (b"array\0" + typ.encode() + b"\0x\0" + values, ("x", exp))
+        for typ, _, values, exp in array_tagkey_values
     ],
 )
-def test_parse_tagkey_binary_array_types(input_str, expected):
-    stream = io.BytesIO(input_str)
-    tokens = BinaryRoffBodyTokenizer(stream).tokenize_array_tagkey()
-    parser = roffparse.RoffParser(tokens, stream)
-    parser.is_binary_file = True
-    parser = roffparse.RoffTagKeyParser(tokens, stream, parser)
-    val = next(iter(parser))
+def test_parse_tagkey_array_types(input_str, expected):
+    val = next(iter(tagkey_parser(input_str)))
     assert val[0] == expected[0]
-    assert np.array_equal(val[1], expected[1])
+    assert same_values(val[1], expected[1])
 
 
 @pytest.mark.parametrize(
     "input_str, expected",
     [
-        ("array int x 1 3", ("x", np.array([3], dtype=np.int32))),
-        ("array float x 1 0.0", ("x", np.array([0.0], dtype=np.float32))),
-        ("array double x 1 0.0", ("x", np.array([0.0], dtype=np.float64))),
-        ("array byte x 2 1 2", ("x", b"\x01\x02")),
-        ("array bool x 1 1", ("x", np.array([True], dtype=np.bool_))),
+        (
+            b"array\0int\0x\0\0\0\0\x02\0\0\0\x01\0\0\0\x02",
+            ("x", np.array([1, 2], dtype=np.int32)),
+        ),
+        (
+            b"array\0double\0x\0\0\0\0\x01" + np.array([1.5], ">f8").tobytes(),
+            ("x", np.array([1.5], dtype=np.float64)),
+        ),
+        (b"array\0byte\0x\0\0\0\0\x02\x01\x02", ("x", b"\x01\x02")),
     ],
 )
-def test_parse_tagkey_ascii_array_types(input_str, expected):
-    stream = io.StringIO(input_str)
-    tokenizer = TextRoffBodyTokenizer(stream)
-    tokens = tokenizer.tokenize_array_tagkey()
-    parser = roffparse.RoffParser(tokens, stream)
-    parser.is_binary_file = False
+def test_parse_tagkey_big_endian_binary_array_types(input_str, expected):
+    stream = io.BytesIO(input_str)
+    tokens = BinaryRoffBodyTokenizer(stream, endianess="big").tokenize_array_tagkey()
+    parser = roffparse.RoffParser(tokens, stream, endianess="big")
+    parser.is_binary_file = True
     parser = roffparse.RoffTagKeyParser(tokens, stream, parser)
     val = next(iter(parser))
     assert val[0] == expected[0]
@@ -269,47 +282,29 @@ def test_parse_tagkey_ascii_array_types(input_str, expected):
 
 
 def test_parse_boolean_values_typing():
-    stream = io.StringIO("bool x 2")
-    tokenizer = TextRoffBodyTokenizer(stream)
-    tokens = tokenizer.tokenize_simple_tagkey()
-    parser = roffparse.RoffParser(tokens, stream)
-    parser.is_binary_file = False
-
-    parser = roffparse.RoffTagKeyParser(tokens, stream, parser)
+    parser = tagkey_parser("bool x 2")
     with pytest.raises(roffparse.RoffTypeError, match="must be either 1 or 0"):
         next(iter(parser))
 
 
 def test_parse_boolean_values():
-    stream = io.StringIO("bool x 1")
-    tokenizer = TextRoffBodyTokenizer(stream)
-    tokens = tokenizer.tokenize_simple_tagkey()
-    parser = roffparse.RoffParser(tokens, stream)
-    parser.is_binary_file = False
-
-    parser = roffparse.RoffTagKeyParser(tokens, stream, parser)
+    parser = tagkey_parser("bool x 1")
     assert next(iter(parser)) == ("x", True)
 
 
-def test_parse_byten_values():
-    stream = io.StringIO("byte x 1")
-    tokenizer = TextRoffBodyTokenizer(stream)
-    tokens = tokenizer.tokenize_simple_tagkey()
-    parser = roffparse.RoffParser(tokens, stream)
-    parser.is_binary_file = False
+@pytest.mark.parametrize("value, expected", [(b"\1", True), (b"\0", False)])
+def test_parse_binary_boolean_values(value, expected):
+    parser = tagkey_parser(b"bool\0x\0" + value)
+    assert next(iter(parser)) == ("x", expected)
 
-    parser = roffparse.RoffTagKeyParser(tokens, stream, parser)
+
+def test_parse_byten_values():
+    parser = tagkey_parser("byte x 1")
     assert next(iter(parser)) == ("x", b"\x01")
 
 
 def test_parse_byte_array_values():
-    stream = io.StringIO("array byte x 2 255 0")
-    tokenizer = TextRoffBodyTokenizer(stream)
-    tokens = tokenizer.tokenize_array_tagkey()
-    parser = roffparse.RoffParser(tokens, stream)
-    parser.is_binary_file = False
-
-    parser = roffparse.RoffTagKeyParser(tokens, stream, parser)
+    parser = tagkey_parser("array byte x 2 255 0")
     assert next(iter(parser)) == ("x", b"\xff\x00")
 
 
@@ -330,3 +325,146 @@ def test_endianess_swap():
     assert parser.endianess == "big"
     assert tag[0] == "t"
     assert next(tag[1]) == ("y", 255)
+
+
+@pytest.mark.parametrize(
+    "typ, values, expected",
+    [
+        (TokenKind.INT, [b"\x01\0\0\0", b"\x02\0\0\0"], np.array([1, 2], np.int32)),
+        (TokenKind.DOUBLE, [b"\0" * 8], np.array([0.0], np.float64)),
+        (TokenKind.BYTE, [b"\x01", b"\x02"], b"\x01\x02"),
+        (TokenKind.BOOL, [b"\x01", b"\x00"], np.array([True, False])),
+    ],
+)
+def test_parse_binary_numeric_array_values(typ, values, expected):
+    stream = io.BytesIO(b"".join(values))
+    tokens = []
+    start = 0
+    for v in values:
+        tokens.append(Token(TokenKind.BINARY_NUMERIC_VALUE, start, start + len(v)))
+        start += len(v)
+    parser = roffparse.RoffParser(iter(tokens), stream)
+    parser.is_binary_file = True
+    tagkey_parser = roffparse.RoffTagKeyParser(iter(tokens), stream, parser)
+    array = tagkey_parser.parse_array_values(typ, "x", len(values))
+    assert np.array_equal(array, expected)
+
+
+def test_parse_binary_bool_array_values_must_be_0_or_1():
+    stream = io.BytesIO(b"\x02\x01")
+    tokens = [
+        Token(TokenKind.BINARY_NUMERIC_VALUE, 0, 1),
+        Token(TokenKind.BINARY_NUMERIC_VALUE, 1, 2),
+    ]
+    parser = roffparse.RoffParser(iter(tokens), stream)
+    parser.is_binary_file = True
+    tagkey_parser = roffparse.RoffTagKeyParser(iter(tokens), stream, parser)
+    with pytest.raises(roffparse.RoffTypeError, match="1 or 0"):
+        tagkey_parser.parse_array_values(TokenKind.BOOL, "x", 2)
+
+
+def test_parse_skips_unconsumed_tagkeys():
+    stream = io.StringIO(
+        "roff-asc\ntag t\nint x 1\nint y 2\nendtag\ntag u\nint z 3\nendtag\n"
+    )
+    parser = roffparse.RoffParser(iter(RoffTokenizer(stream)), stream)
+    tags = iter(parser)
+    name, tagkeys = next(tags)
+    assert name == "t"
+    assert next(tagkeys) == ("x", 1)
+    name, tagkeys = next(tags)
+    assert name == "u"
+    assert list(tagkeys) == [("z", 3)]
+    assert next(tags, None) is None
+
+
+@pytest.mark.parametrize("endianess", ["little", "big"])
+def test_decode_array_blob(endianess):
+    byteorder = "<" if endianess == "little" else ">"
+    buf = np.array([1, 2, 3], dtype=byteorder + "i4").tobytes()
+    values = roffparse.decode_array_blob(buf, TokenKind.INT, endianess, 3, "x")
+    assert values.dtype.isnative
+    assert values.tolist() == [1, 2, 3]
+    assert np.shares_memory(values, np.frombuffer(buf, np.uint8)) == (
+        endianess == sys.byteorder
+    )
+
+
+def test_decode_short_array_blob():
+    buf = np.array([1, 2], dtype=np.int32).tobytes()
+    with pytest.raises(roffparse.RoffSyntaxError, match="array x"):
+        roffparse.decode_array_blob(buf, TokenKind.INT, "little", 3, "x")
+
+
+def test_parse_repeated_names_are_shared():
+    stream = io.BytesIO(
+        b"roff-bin\0tag\0t\0int\0x\0\x01\0\0\0endtag\0"
+        b"tag\0u\0int\0x\0\x02\0\0\0endtag\0"
+    )
+    parser = roffparse.RoffParser(iter(RoffTokenizer(stream)), stream)
+    (first,), (second,) = [list(tagkeys) for _, tagkeys in iter(parser)]
+    assert first == ("x", 1)
+    assert second == ("x", 2)
+    assert first[0] is second[0]
+
+
+@pytest.mark.parametrize(
+    "input_str",
+    [
+        "array int x 3 1 2 3",
+        "array int x 3 1\n2\n3",
+        "array int x 3 1 #comment 4 5# 2 3",
+    ],
+)
+def test_parse_ascii_array_separators(input_str):
+    stream = io.StringIO(input_str + " int y 4")
+    tokenizer = TextRoffBodyTokenizer(stream)
+    tokens = iter(tokenizer.tokenize_tagkey())
+    parser = roffparse.RoffParser(tokens, stream)
+    tagkey_parser = roffparse.RoffTagKeyParser(tokens, stream, parser)
+    name, values = tagkey_parser.parse_tagkey()
+    assert name == "x"
+    assert values.tolist() == [1, 2, 3]
+
+
+@pytest.mark.parametrize(
+    "make_stream",
+    [io.StringIO, lambda s: io.TextIOWrapper(io.BytesIO(s.encode("ascii")))],
+)
+def test_parse_ascii_char_array(make_stream):
+    stream = make_stream('array char x 3 "a" #"b"# "" "cd" int y 4')
+    tokenizer = TextRoffBodyTokenizer(stream)
+    tokens = iter(tokenizer.tokenize_tagkey())
+    parser = roffparse.RoffParser(tokens, stream)
+    parser.is_binary_file = False
+    tagkey_parser = roffparse.RoffTagKeyParser(tokens, stream, parser)
+    name, values = tagkey_parser.parse_tagkey()
+    assert name == "x"
+    assert values.tolist() == ["a", "", "cd"]
+
+
+def test_parse_binary_char_array():
+    stream = io.BytesIO(b"array\0char\0x\0\3\0\0\0a\0\0cd\0")
+    tokenizer = BinaryRoffBodyTokenizer(stream)
+    tokens = iter(tokenizer.tokenize_tagkey())
+    parser = roffparse.RoffParser(tokens, stream)
+    parser.is_binary_file = True
+    tagkey_parser = roffparse.RoffTagKeyParser(tokens, stream, parser)
+    name, values = tagkey_parser.parse_tagkey()
+    assert name == "x"
+    assert values.tolist() == ["a", "", "cd"]
+
+
+def test_parse_char_array_expects_string_literals():
+    tokens = iter(
+        [
+            Token(TokenKind.STRING_LITERAL, 0, 1),
+            Token(TokenKind.NUMERIC_VALUE, 2, 3),
+        ]
+    )
+    stream = io.BytesIO(b"a\x001")
+    parser = roffparse.RoffParser(tokens, stream)
+    parser.is_binary_file = True
+    tagkey_parser = roffparse.RoffTagKeyParser(tokens, stream, parser)
+    with pytest.raises(roffparse.RoffTypeError, match="string literal"):
+        tagkey_parser.parse_array_values(TokenKind.CHAR, "x", 2)
@@ -1,4 +1,10 @@
-from roffio import read
+import io
+import mmap
+
+import pytest
+
+from _roffio.parser import ParsingException, RoffSyntaxError
+from roffio import lazy_read, read
 
 
 def test_file_mode_creation(tmp_path):
@@ -13,3 +19,98 @@ def test_file_mode_creation(tmp_path):
         f.write("roff-asc tag a int σ 0 endtag")
 
     assert read(test_file) == {"a": {"σ": 0}}
+
+
+def test_read_big_endian_filedata():
+    contents = (
+        b"roff-bin\0tag\0filedata\0int\0byteswaptest\0\0\0\0\x01"
+        b"int\0x\0\0\0\0\x05endtag\0"
+        b"tag\0t\0int\0y\0\0\0\0\x06endtag\0"
+    )
+
+    assert read(io.BytesIO(contents)) == {
+        "filedata": {"byteswaptest": 1, "x": 5},
+        "t": {"y": 6},
+    }
+
+
+def test_lazy_read_tagkeys_after_next_tag():
+    contents = (
+        b"roff-bin\0tag\0a\0int\0x\0\x01\0\0\0int\0y\0\x02\0\0\0endtag\0"
+        b"tag\0b\0int\0z\0\x03\0\0\0endtag\0"
+    )
+
+    with lazy_read(io.BytesIO(contents)) as roff_iter:
+        tags = list(roff_iter)
+        assert [(name, list(tagkeys)) for name, tagkeys in tags] == [
+            ("a", [("x", 1), ("y", 2)]),
+            ("b", [("z", 3)]),
+        ]
+
+
+def test_lazy_read_partially_consumed_tagkeys():
+    contents = "roff-asc tag a int x 1 int y 2 endtag tag b int z 3 endtag"
+
+    with lazy_read(io.StringIO(contents)) as roff_iter:
+        name, tagkeys = next(roff_iter)
+        assert next(tagkeys) == ("x", 1)
+        assert next(roff_iter)[0] == "b"
+        assert list(tagkeys) == [("y", 2)]
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [
+        b"roff-bin\0tag\0t\0int\0x\0\x01\0\0\0",
+        b"roff-bin\0tag\0t\0int\0x\0",
+        b"roff-bin\0tag\0t\0array\0char\0x\0\x02\0\0\0a\0",
+        b"roff-bin\0tag\0t\0array\0int\0x\0\x03\0\0\0\x01\0",
+    ],
+)
+def test_read_missing_endtag(contents):
+    with pytest.raises(RoffSyntaxError):
+        read(io.BytesIO(contents))
+
+
+def test_read_missing_endtag_names_tag():
+    with pytest.raises(RoffSyntaxError, match="endtag for tag t"):
+        read(io.BytesIO(b"roff-bin\0tag\0t\0int\0x\0\x01\0\0\0"))
+
+
+def test_read_ascii_array_too_few_values():
+    with pytest.raises(ParsingException, match="Expected numeric value"):
+        read(io.StringIO("roff-asc tag t array int x 3 1 2 endtag"))
+
+
+def test_read_mmap(tmp_path):
+    test_file = tmp_path / "test.roff"
+    test_file.write_bytes(
+        b"roff-bin\0tag\0a\0int\0b\0\x01\0\0\0char\0c\0hi\0"
+        b"array\0char\0d\0\x02\0\0\0x\0y\0endtag\0"
+    )
+
+    with open(test_file, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as contents:
+        values = read(contents)
+
+    assert values["a"]["b"] == 1
+    assert values["a"]["c"] == "hi"
+    assert values["a"]["d"].tolist() == ["x", "y"]
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [
+        b"roff-bin\0tag\0a\0int\0b\0\x01\0",
+        b"roff-bin\0tag\0a\0array\0int\0b\0\x03\0\0\0\x01\0",
+    ],
+)
+def test_read_truncated_mmap(tmp_path, contents):
+    test_file = tmp_path / "test.roff"
+    test_file.write_bytes(contents)
+
+    with open(test_file, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped, pytest.raises(RoffSyntaxError):
+        read(mapped)
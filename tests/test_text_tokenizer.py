@@ -2,7 +2,7 @@ import io
 
 import hypothesis.strategies as st
 import pytest
-from hypothesis import given
+from hypothesis import given, settings
 
 from _roffio.tokenizer import RoffTokenizer
 from _roffio.tokenizer.errors import TokenizationError
@@ -11,27 +11,31 @@ from _roffio.tokenizer.token_kind import TokenKind
 
 from .generators.roff_file_contents import ascii_file_contents, whitespace
 
-
-@pytest.fixture(params=[lambda x: x + " ", lambda x: " " + x, lambda x: x])
-def pad_with_space(request):
-    return request.param
-
-
 test_comment = "# A comment #"
 
-
-@pytest.fixture(
-    params=[lambda x: x + test_comment, lambda x: test_comment + x, lambda x: x]
-)
-def pad_with_ascii_comment(request):
+# The spaces and comments the contents are padded with in
+# roff_text_body_tokenizer, before and after the contents on their own
+# and together.
+ascii_paddings = {
+    "none": lambda x: x,
+    "space-before": lambda x: " " + x,
+    "space-after": lambda x: x + " ",
+    "comment-before": lambda x: test_comment + x,
+    "comment-after": lambda x: x + test_comment,
+    "space-comment-before": lambda x: " " + test_comment + x,
+    "comment-space-after": lambda x: x + test_comment + " ",
+}
+
+
+@pytest.fixture(params=ascii_paddings.values(), ids=ascii_paddings.keys())
+def pad_ascii(request):
     return request.param
 
 
 @pytest.fixture
-def roff_text_body_tokenizer(pad_with_space, pad_with_ascii_comment):
+def roff_text_body_tokenizer(pad_ascii):
     def make_body_tokenizer(contents):
-        contents = pad_with_space(pad_with_ascii_comment(contents))
-        stream = io.StringIO(contents)
+        stream = io.StringIO(pad_ascii(contents))
         return TextRoffBodyTokenizer(stream)
 
     return make_body_tokenizer
@@ -48,11 +52,12 @@ def test_tokenize_ascii_keywords(roff_text_body_tokenizer, token_word, expected_
     assert tok.get_value(tokenizer.stream) == token_word
 
 
-def test_tokenize_ascii_string(roff_text_body_tokenizer):
-    tokenizer = roff_text_body_tokenizer('"A string"')
+@pytest.mark.parametrize("string", ["A string", ""])
+def test_tokenize_ascii_string(roff_text_body_tokenizer, string):
+    tokenizer = roff_text_body_tokenizer(f'"{string}"')
     token = next(tokenizer.tokenize_string_literal())
     assert token.kind == TokenKind.STRING_LITERAL
-    assert token.get_value(tokenizer.stream) == "A string"
+    assert token.get_value(tokenizer.stream) == string
 
 
 @pytest.mark.parametrize("value_string", ["321", "1", "1.0", "1.0E+1", "-1.0"])
@@ -130,6 +135,38 @@ def test_tokenize_simple_ascii_tagkey(
     assert read_var_name == varname
 
 
+@pytest.mark.parametrize(
+    "contents, expected",
+    [
+        ("x 1", ["x", "1"]),
+        ('x\n#c# "a b"', ["x", "a b"]),
+        ('x ""', ["x", ""]),
+        ('x"y" 2', ['x"y"', "2"]),
+        ("x " + "#" + "c" * 1000 + "# -1.5e3", ["x", "-1.5e3"]),
+    ],
+)
+@pytest.mark.parametrize(
+    "make_stream",
+    [io.StringIO, lambda s: io.TextIOWrapper(io.BytesIO(s.encode("ascii")))],
+)
+def test_simple_tagkey_tokens(make_stream, contents, expected):
+    stream = make_stream(contents + " endtag")
+    tokenizer = TextRoffBodyTokenizer(stream)
+    tokens = []
+    tokenizer.simple_tagkey_tokens(TokenKind.INT, tokens)
+    assert [t.get_value(stream) for t in tokens] == expected
+    assert next(tokenizer.tokenize_keyword[TokenKind.ENDTAG]()).kind == (
+        TokenKind.ENDTAG
+    )
+
+
+@pytest.mark.parametrize("contents", ['x "a', "x", 'x "'])
+def test_simple_tagkey_tokens_incomplete(contents):
+    tokenizer = TextRoffBodyTokenizer(io.StringIO(contents))
+    with pytest.raises(TokenizationError):
+        tokenizer.simple_tagkey_tokens(TokenKind.CHAR, [])
+
+
 @pytest.mark.parametrize(
     "varname, typename, typekind, values, valuekind",
     [
@@ -196,10 +233,91 @@ def test_tokenize_tag_group(roff_text_body_tokenizer):
     assert tokens[10].get_value(tokenizer.stream) == "4.0"
 
 
+def test_tokenize_empty_tag_group(roff_text_body_tokenizer):
+    tokenizer = roff_text_body_tokenizer("tag t endtag")
+    tokens = list(tokenizer.tokenize_tag_group())
+
+    assert [t.kind for t in tokens] == [
+        TokenKind.TAG,
+        TokenKind.NAME,
+        TokenKind.ENDTAG,
+    ]
+
+
+def test_tokenize_tag_group_missing_endtag(roff_text_body_tokenizer):
+    tokenizer = roff_text_body_tokenizer("tag t int x 1 bogus")
+    tokens = []
+    with pytest.raises(TokenizationError, match="endtag"):
+        tokens.extend(tokenizer.tokenize_tag_group())
+
+    assert [t.kind for t in tokens] == [
+        TokenKind.TAG,
+        TokenKind.NAME,
+        TokenKind.INT,
+        TokenKind.NAME,
+        TokenKind.NUMERIC_VALUE,
+    ]
+
+
 @given(ascii_file_contents())
+# Each example tokenizes a whole generated file
+@settings(max_examples=50, deadline=None)
 def test_tokenize_ascii_file(ascii_str):
     buff = io.StringIO(ascii_str)
     tokenizer = RoffTokenizer(buff)
+    keywords = TokenKind.keywords()
     for t in tokenizer:
-        if t.kind in TokenKind.keywords():
-            assert t.get_value(buff) == TokenKind.keywords()[t.kind]
+        keyword = keywords.get(t.kind)
+        if keyword is not None:
+            assert t.get_value(buff) == keyword
+
+
+def test_tokenize_tokens_longer_than_scan_chunk():
+    name = "x" * 1000
+    stream = io.StringIO("#" + " " * 1000 + "#" + name + " " * 1000 + "1")
+    tokenizer = TextRoffBodyTokenizer(stream)
+    token = next(tokenizer.tokenize_name())
+    assert token.get_value(stream) == name
+    assert next(tokenizer.tokenize_numeric_value()).get_value(stream) == "1"
+
+
+@pytest.mark.parametrize("value_string", ["\u0661", "\u00bd", "x1"])
+def test_tokenize_non_ascii_numeric_value(value_string):
+    tokenizer = TextRoffBodyTokenizer(io.StringIO(value_string))
+    with pytest.raises(TokenizationError):
+        next(tokenizer.tokenize_numeric_value())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 8, 1 << 16])
+def test_tokenize_array_data_across_chunks(monkeypatch, chunk_size):
+    monkeypatch.setattr(
+        "_roffio.tokenizer.text_roff_body_tokenizer.ARRAY_CHUNK_SIZE", chunk_size
+    )
+    values = ["1.0", "-2e-3", '"a b"', '""', "12345678901"]
+    stream = io.StringIO(
+        " # a # ".join(values) + "\n#comment longer than chunks# 4 endtag"
+    )
+    tokenizer = TextRoffBodyTokenizer(stream)
+    tokens = list(tokenizer.tokenize_array_data(TokenKind.FLOAT, None))
+
+    assert [t.get_value(stream) for t in tokens] == [
+        "1.0",
+        "-2e-3",
+        "a b",
+        "",
+        "12345678901",
+        "4",
+    ]
+    assert next(tokenizer.tokenize_keyword[TokenKind.ENDTAG]()).kind == (
+        TokenKind.ENDTAG
+    )
+
+
+def test_tokenize_array_data_unterminated_string():
+    stream = io.StringIO('1 2 "a')
+    tokenizer = TextRoffBodyTokenizer(stream)
+    tokens = list(tokenizer.tokenize_array_data(TokenKind.CHAR, None))
+
+    assert [t.get_value(stream) for t in tokens] == ["1", "2"]
+    # As for tokenize_value, the stream is left at the quote.
+    assert stream.read() == '"a'
@@ -3,7 +3,9 @@ import io
 import pytest
 
 from _roffio.tokenizer import RoffTokenizer
-from _roffio.tokenizer.errors import WrongFileModeError
+from _roffio.tokenizer.errors import TokenizationError, WrongFileModeError
+from _roffio.tokenizer.roff_tokenizer import tokenize_header
+from _roffio.tokenizer.token import Token
 from _roffio.tokenizer.token_kind import TokenKind
 
 
@@ -43,3 +45,52 @@ def test_wrong_mode_error_ascii():
     tokens = iter(tokenizer)
     with pytest.raises(WrongFileModeError):
         next(tokens).kind  # noqa: B018
+
+
+@pytest.mark.parametrize(
+    "stream", [io.BytesIO(b"roff-bix\0"), io.BytesIO(b"roff-bin "), io.StringIO("")]
+)
+def test_tokenize_invalid_header(stream):
+    with pytest.raises(TokenizationError):
+        next(tokenize_header(stream))
+    assert stream.tell() == 0
+
+
+def test_tokenize_text_file_with_crlf(tmp_path):
+    path = tmp_path / "crlf.roff"
+    path.write_bytes(b"roff-asc\r\n#comment#\r\ntag t\r\nint x 1\r\nendtag\r\n")
+    with open(path) as stream:
+        tokens = list(RoffTokenizer(stream))
+        assert [t.kind for t in tokens] == [
+            TokenKind.ROFF_ASC,
+            TokenKind.TAG,
+            TokenKind.NAME,
+            TokenKind.INT,
+            TokenKind.NAME,
+            TokenKind.NUMERIC_VALUE,
+            TokenKind.ENDTAG,
+        ]
+        assert tokens[2].get_value(stream) == "t"
+        assert tokens[5].get_value(stream) == "1"
+
+
+def test_token_slots():
+    token = Token(TokenKind.NAME, 1, 3)
+    assert not hasattr(token, "__dict__")
+    assert token == Token(TokenKind.NAME, 1, 3)
+    assert token != Token(TokenKind.NAME, 1, 4)
+    assert repr(token) == f"Token(kind={TokenKind.NAME!r}, start=1, end=3)"
+
+
+def test_token_kind_lookup():
+    assert len(TokenKind) == 16
+    kinds = {kind: kind.name for kind in TokenKind}
+    assert all(kinds[kind] == kind.name for kind in TokenKind)
+    assert TokenKind.INT in frozenset(TokenKind.simple_types())
+
+
+def test_token_kind_keywords_are_shared_and_read_only():
+    assert TokenKind.keywords() is TokenKind.keywords()
+    assert TokenKind.simple_types() is TokenKind.simple_types()
+    with pytest.raises(TypeError):
+        TokenKind.keywords()[TokenKind.TAG] = "gat"
@@ -4,6 +4,7 @@ import pytest
 
 from _roffio.tokenizer.combinators import one_of, repeated
 from _roffio.tokenizer.common import tokenize_word
+from _roffio.tokenizer.errors import TokenizationError
 
 
 @pytest.mark.parametrize("inp_str", ["foo foo foo", "foo foo foobar"])
@@ -22,3 +23,20 @@ def test_combinators(inp_str):
     assert next(test_tokenizer).kind == "foo"
     with pytest.raises(StopIteration):
         next(test_tokenizer)
+
+
+def test_one_of_reports_all_errors():
+    stream = io.StringIO("bar")
+
+    tokenizer = one_of(
+        tokenize_word(stream, "foo", "foo"), tokenize_word(stream, "baz", "baz")
+    )
+
+    with pytest.raises(TokenizationError) as excinfo:
+        next(tokenizer())
+    assert str(excinfo.value) == (
+        "Tokenization failed, due to one of\n"
+        "*Token 'bar' did not match foo\n"
+        "*Token 'bar' did not match baz"
+    )
+    assert stream.tell() == 0
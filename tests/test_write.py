@@ -4,6 +4,7 @@ import numpy as np
 import pytest
 
 import _roffio.writing as roffwrite
+import roffio
 
 
 @pytest.mark.parametrize(
@@ -52,3 +53,169 @@ def test_tagkey_type_prefix_binary(value, expected):
     buf = io.BytesIO()
     roffwrite.write_binary_tagkey(buf, "x", value)
     assert buf.getvalue().startswith(expected)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        np.arange(10, dtype=np.int32)[::3],
+        np.arange(6, dtype=np.float64)[::-1],
+        np.array([True, False, True])[1:],
+        np.array([], dtype=np.float32),
+    ],
+)
+def test_write_binary_array_values(value):
+    buf = io.BytesIO()
+    roffwrite.write_binary_tagkey(buf, "x", value)
+    expected = b"x\0" + len(value).to_bytes(4, "little") + value.tobytes()
+    assert buf.getvalue().endswith(expected)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ([1, -2, 3], np.array([1, -2, 3], dtype=np.int32)),
+        ([1.5, 2.0], np.array([1.5, 2.0], dtype=np.float64)),
+        ([True, False], np.array([1, 0], dtype=np.uint8)),
+        (["a", "bc"], b"a\0bc\0"),
+    ],
+)
+def test_write_binary_list_values(value, expected):
+    buf = io.BytesIO()
+    roffwrite.write_binary_tagkey(buf, "x", value)
+    values = expected if isinstance(expected, bytes) else expected.tobytes()
+    assert buf.getvalue().endswith(b"x\0" + len(value).to_bytes(4, "little") + values)
+
+
+@pytest.mark.parametrize("value", [[1, 2.0], [1, True], [1.0, "a"]])
+def test_write_binary_inhomogenous_list(value):
+    with pytest.raises(roffwrite.RoffWriteError, match="homogenous"):
+        roffwrite.write_binary_tagkey(io.BytesIO(), "x", value)
+
+
+@pytest.mark.parametrize("value", [[1, 2.0], [1, True], [1.0, "a"]])
+def test_write_ascii_inhomogenous_list(value):
+    with pytest.raises(roffwrite.RoffWriteError, match="homogenous"):
+        roffwrite.write_ascii_tagkey(io.StringIO(), "x", value)
+
+
+class Subclassed(int):
+    pass
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("a", "char"),
+        (True, "bool"),
+        (b"\x01", "byte"),
+        (1, "int"),
+        (1.0, "double"),
+        (Subclassed(1), "int"),
+        (np.float64(1.0), "double"),
+        (np.float32(1.0), "float"),
+        (np.bool_(True), "bool"),
+        (np.int64(1), "int"),
+    ],
+)
+def test_type_string(value, expected):
+    assert roffwrite.type_string(value) == expected
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (np.array([1, -2], dtype=np.int32), "array int x 2\n1\n-2\n"),
+        (np.array([1, 2], dtype=np.uint8), "array byte x 2\n1\n2\n"),
+        (np.array([0.1, 1e20], dtype=np.float32), "array float x 2\n0.1\n1e+20\n"),
+        (np.array([0.1, 1e-05], dtype=np.float64), "array double x 2\n0.1\n1e-05\n"),
+        (np.array([True, False]), "array bool x 2\n1\n0\n"),
+        (np.array([], dtype=np.int32), "array byte x 0\n"),
+        ([1, -2], "array int x 2\n1\n-2\n"),
+        ([True, False], "array bool x 2\n1\n0\n"),
+        (["a", "b c"], 'array char x 2\n"a"\n"b c"\n'),
+        (b"\x01\x02", "array byte x 2\n1\n2\n"),
+        ([], "array byte x 0\n"),
+        (1.5, "double x 1.5\n"),
+        ("a", 'char x "a"\n'),
+    ],
+)
+def test_write_ascii_array_values(value, expected):
+    buf = io.StringIO()
+    roffwrite.write_ascii_tagkey(buf, "x", value)
+    assert buf.getvalue() == expected
+
+
+def test_write_headers():
+    binary = io.BytesIO()
+    roffwrite.write_binary_roff(binary, [])
+    ascii = io.StringIO()
+    roffwrite.write_ascii_roff(ascii, [])
+
+    creator = f"#Creator: roffio, version {roffio.__version__}#"
+    assert binary.getvalue() == b"roff-bin\0#ROFF file#\0" + creator.encode() + b"\0"
+    assert ascii.getvalue() == "roff-asc\n#ROFF file#\n" + creator + "\n"
+
+
+@pytest.mark.parametrize(
+    "name, message",
+    [
+        ("", "0 length"),
+        ("a b", "space"),
+        ("a\tb", "space"),
+        ("a　b", "space"),
+        ("a#b", "'#'"),
+        ("#a b", "space"),
+    ],
+)
+def test_check_valid_ascii_name(name, message):
+    with pytest.raises(roffwrite.RoffWriteError, match=message):
+        roffwrite.check_valid_ascii_name(name)
+
+
+def test_check_valid_ascii_name_accepts_name():
+    roffwrite.check_valid_ascii_name("a_b.c")
+
+
+class BytesSubclass(bytes):
+    pass
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (BytesSubclass(b"ab"), b"array\0byte\0x\0\x02\0\0\0ab"),
+        (BytesSubclass(b"a"), b"byte\0x\0a"),
+        (b"", b"array\0byte\0x\0\0\0\0\0"),
+        (np.float32(1.0), b"float\0x\0" + np.float32(1.0).tobytes()),
+        (range(2), b"array\0int\0x\0\x02\0\0\0" + np.arange(2, dtype="<i4").tobytes()),
+        ({1, 2}, b"array\0int\0x\0\x02\0\0\0" + np.arange(1, 3, dtype="<i4").tobytes()),
+    ],
+)
+def test_write_binary_tagkey_dispatch(value, expected):
+    buf = io.BytesIO()
+    roffwrite.write_binary_tagkey(buf, "x", value)
+    assert buf.getvalue() == expected
+
+
+@pytest.mark.parametrize(
+    "value",
+    [True, np.True_, 3, -(2**31), np.int64(5), np.int16(-3), np.float32(1.5), 1.5],
+)
+def test_binary_value_matches_cast_to_roff(value):
+    type_str = roffwrite.type_string(value)
+    assert (
+        roffwrite.binary_value(value, type_str)
+        == roffwrite.cast_to_roff(value, type_str).tobytes()
+    )
+
+
+def test_binary_value_out_of_range_int():
+    with pytest.raises(OverflowError):
+        roffwrite.binary_value(2**40, "int")
+
+
+def test_binary_name_rejects_zero_character():
+    for _ in range(2):
+        with pytest.raises(roffwrite.RoffWriteError, match="zero-character"):
+            roffwrite.write_binary_tagkey(io.BytesIO(), "a\0b", 1)